@@ -0,0 +1,93 @@
+import random
+import sys
+import time
+
+from logic import *
+
+PEOPLE = 8
+PUZZLES = 20
+
+
+def main():
+    people = int(sys.argv[1]) if len(sys.argv) > 1 else PEOPLE
+    count = int(sys.argv[2]) if len(sys.argv) > 2 else PUZZLES
+    random.seed(0)
+    puzzles = [generate_puzzle(people) for _ in range(count)]
+
+    print(f"{count} generated puzzles with {people} people")
+    timings = dict()
+    for name, check in [
+        ("model_check", model_check),
+        ("resolution", resolution_check),
+    ]:
+        start = time.perf_counter()
+        for knowledge, symbols in puzzles:
+            for symbol in symbols:
+                check(knowledge, symbol)
+        timings[name] = time.perf_counter() - start
+        print(f"  {name}: {timings[name]:.4f}s")
+
+    start = time.perf_counter()
+    for knowledge, symbols in puzzles:
+        BDD(knowledge).forced()
+    print(f"  bdd forced symbols: {time.perf_counter() - start:.4f}s")
+
+    statistics = dict()
+    generated = 0
+    for knowledge, symbols in puzzles:
+        for symbol in symbols:
+            resolution_check(knowledge, symbol, statistics)
+            generated += statistics["generated"]
+    print(f"  resolution clauses generated: {generated}")
+
+    # Compare search over the original and the simplified sentences
+    simplified = [
+        (knowledge.simplify(), [symbol.simplify() for symbol in symbols])
+        for knowledge, symbols in puzzles
+    ]
+    before = sum(knowledge.size for knowledge, _ in puzzles)
+    after = sum(knowledge.size for knowledge, _ in simplified)
+    print(f"  simplify: {before} -> {after} nodes "
+          f"({100 * (after - before) / before:+.1f}%)")
+    for label, sentences in [("original", puzzles), ("simplified", simplified)]:
+        start = time.perf_counter()
+        for knowledge, symbols in sentences:
+            model_check_search(knowledge, symbols)
+        timings[label] = time.perf_counter() - start
+    print(f"  search: {timings['original']:.4f}s -> "
+          f"{timings['simplified']:.4f}s "
+          f"({timings['original'] / timings['simplified']:.2f}x)")
+
+
+def generate_puzzle(people):
+    """
+    Generate a random knights and knaves puzzle: everyone is either a
+    knight or a knave, and says one random statement about the others.
+    Return the knowledge base and the list of symbols to query.
+    """
+    knights = [Symbol(f"{chr(65 + i)} is a Knight") for i in range(people)]
+    knaves = [Symbol(f"{chr(65 + i)} is a Knave") for i in range(people)]
+    knowledge = []
+    for knight, knave in zip(knights, knaves):
+        knowledge.append(Or(knight, knave))
+        knowledge.append(Not(And(knight, knave)))
+    for knight in knights:
+        knowledge.append(Biconditional(random_statement(knights, knaves), knight))
+    return And(*knowledge), knights + knaves
+
+
+def random_statement(knights, knaves, depth=2):
+    """Return a random sentence about who is a knight or a knave."""
+    if depth == 0 or random.random() < 0.3:
+        return random.choice(knights + knaves)
+    connective = random.choice([And, Or, Not])
+    if connective is Not:
+        return Not(random_statement(knights, knaves, depth - 1))
+    return connective(
+        random_statement(knights, knaves, depth - 1),
+        random_statement(knights, knaves, depth - 1)
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,19 +1,169 @@
 import itertools
+import heapq
+import multiprocessing
+import time
+import weakref
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
 
 
 class Sentence():
+    """
+    Sentences are immutable and hash-consed: constructing a sentence equal
+    to a live one returns that same node, so equality is identity and the
+    hash, symbol set and depth are computed once at construction.
+    """
+
+    interned = weakref.WeakValueDictionary()
+
+    def __new__(cls, *arguments):
+        key = (cls, arguments)
+        sentence = Sentence.interned.get(key)
+        if sentence is None:
+            sentence = super().__new__(cls)
+            sentence.initialize(*arguments)
+            sentence.simplified = None
+            sentence.arguments = arguments
+            sentence.hash = hash(key)
+            Sentence.interned[key] = sentence
+        return sentence
+
+    def __reduce__(self):
+        return (type(self), self.arguments)
+
+    def __eq__(self, other):
+        return self is other
+
+    def __hash__(self):
+        return self.hash
+
+    def initialize(self, *arguments):
+        """Sets up a newly interned node, caching symbol_set, depth and size."""
+        raise Exception("nothing to initialize")
 
     def evaluate(self, model):
         """Evaluates the logical sentence."""
         raise Exception("nothing to evaluate")
 
+    def simplify(self):
+        """
+        Returns an equivalent sentence in negation normal form, with nested
+        And/Or flattened, duplicates removed, and contradictions and
+        tautologies folded to the constants FALSE and TRUE. The result is
+        cached on the node.
+        """
+        if self.simplified is None:
+            self.simplified = self.simplification()
+        return self.simplified
+
+    def simplification(self):
+        """Computes the simplified form returned by `simplify`."""
+        raise Exception("nothing to simplify")
+
+    def simplify_negation(self):
+        """Returns the simplified form of the sentence's negation."""
+        raise Exception("nothing to simplify")
+
+    def evaluate_partial(self, model):
+        """
+        Evaluates the logical sentence under a partial model, returning
+        True, False, or None when the value depends on unassigned symbols.
+        """
+        raise Exception("nothing to evaluate")
+
     def formula(self):
         """Returns string formula representing logical sentence."""
         return ""
 
     def symbols(self):
-        """Returns a set of all symbols in the logical sentence."""
-        return set()
+        """Returns a frozenset of all symbols in the logical sentence."""
+        return self.symbol_set
+
+    def encode(self, cnf):
+        """Adds Tseitin clauses for the sentence to `cnf`, returns its literal."""
+        raise Exception("nothing to encode")
+
+    def expression(self, index):
+        """
+        Returns Python source evaluating the sentence on an int `model`,
+        where bit `index[name]` holds the value of symbol `name`.
+        """
+        raise Exception("nothing to compile")
+
+    def compile(self, symbols):
+        """
+        Returns a function evaluating the sentence on an int model, where
+        bit i holds the value of the i-th symbol name in `symbols`.
+        Sentences too deep for the Python parser, or too large written
+        out as a tree, are compiled to steps instead.
+        """
+        if self.depth > COMPILE_DEPTH_LIMIT or self.size > COMPILE_SIZE_LIMIT:
+            return self.compile_steps(symbols)
+        index = {symbol: i for i, symbol in enumerate(symbols)}
+        return eval(f"lambda model: bool({self.expression(index)})")
+
+    def compile_steps(self, symbols):
+        """
+        Returns a function like `compile`'s that evaluates every distinct
+        subsentence once per model, operands first, without recursion.
+        """
+        index = {symbol: i for i, symbol in enumerate(symbols)}
+        position = dict()
+        steps = []
+        stack = [self]
+        while stack:
+            sentence = stack[-1]
+            if sentence in position:
+                stack.pop()
+                continue
+            if isinstance(sentence, Symbol):
+                step = (Symbol, index[sentence.name])
+            else:
+                pending = [
+                    operand for operand in sentence.arguments
+                    if operand not in position
+                ]
+                if pending:
+                    stack.extend(pending)
+                    continue
+                step = (type(sentence),
+                        [position[operand] for operand in sentence.arguments])
+            stack.pop()
+            position[sentence] = len(steps)
+            steps.append(step)
+
+        def evaluate(model):
+            values = []
+            for kind, operands in steps:
+                if kind is Symbol:
+                    value = model >> operands & 1 == 1
+                elif kind is Not:
+                    value = not values[operands[0]]
+                elif kind is And:
+                    value = all(values[i] for i in operands)
+                elif kind is Or:
+                    value = any(values[i] for i in operands)
+                elif kind is Implication:
+                    value = not values[operands[0]] or values[operands[1]]
+                else:
+                    value = values[operands[0]] == values[operands[1]]
+                values.append(value)
+            return values[-1]
+        return evaluate
+
+    def table(self, columns):
+        """
+        Returns the sentence's truth table as packed uint64 words, given
+        the packed column of every symbol name in `columns`.
+        """
+        raise Exception("nothing to tabulate")
+
+    def diagram(self, bdd):
+        """Builds the sentence in `bdd`, returning its node."""
+        raise Exception("nothing to build")
 
     @classmethod
     def validate(cls, sentence):
@@ -44,14 +194,11 @@ class Sentence():
 
 class Symbol(Sentence):
 
-    def __init__(self, name):
+    def initialize(self, name):
         self.name = name
-
-    def __eq__(self, other):
-        return isinstance(other, Symbol) and self.name == other.name
-
-    def __hash__(self):
-        return hash(("symbol", self.name))
+        self.symbol_set = frozenset([name])
+        self.depth = 0
+        self.size = 1
 
     def __repr__(self):
         return self.name
@@ -62,23 +209,45 @@ class Symbol(Sentence):
         except KeyError:
             raise Exception(f"variable {self.name} not in model")
 
+    def evaluate_partial(self, model):
+        value = model.get(self.name)
+        return None if value is None else bool(value)
+
+    def simplification(self):
+        return self
+
+    def simplify_negation(self):
+        return Not(self)
+
+    def table(self, columns):
+        try:
+            return columns[self.name]
+        except KeyError:
+            raise Exception(f"variable {self.name} not in model")
+
+    def diagram(self, bdd):
+        return bdd.variable(self.name)
+
     def formula(self):
         return self.name
 
-    def symbols(self):
-        return {self.name}
+    def encode(self, cnf):
+        return cnf.variable(self.name)
+
+    def expression(self, index):
+        try:
+            return f"(model >> {index[self.name]} & 1)"
+        except KeyError:
+            raise Exception(f"variable {self.name} not in model")
 
 
 class Not(Sentence):
-    def __init__(self, operand):
+    def initialize(self, operand):
         Sentence.validate(operand)
         self.operand = operand
-
-    def __eq__(self, other):
-        return isinstance(other, Not) and self.operand == other.operand
-
-    def __hash__(self):
-        return hash(("not", hash(self.operand)))
+        self.symbol_set = operand.symbol_set
+        self.depth = operand.depth + 1
+        self.size = operand.size + 1
 
     def __repr__(self):
         return f"Not({self.operand})"
@@ -86,26 +255,44 @@ class Not(Sentence):
     def evaluate(self, model):
         return not self.operand.evaluate(model)
 
+    def evaluate_partial(self, model):
+        value = self.operand.evaluate_partial(model)
+        return None if value is None else not value
+
+    def simplification(self):
+        return self.operand.simplify_negation()
+
+    def simplify_negation(self):
+        return self.operand.simplify()
+
     def formula(self):
         return "¬" + Sentence.parenthesize(self.operand.formula())
 
-    def symbols(self):
-        return self.operand.symbols()
+    def encode(self, cnf):
+        return -cnf.literal(self.operand)
+
+    def expression(self, index):
+        return f"(not {self.operand.expression(index)})"
+
+    def table(self, columns):
+        return ~self.operand.table(columns)
+
+    def diagram(self, bdd):
+        return bdd.negate(bdd.node(self.operand))
 
 
 class And(Sentence):
-    def __init__(self, *conjuncts):
+    def initialize(self, *conjuncts):
         for conjunct in conjuncts:
             Sentence.validate(conjunct)
-        self.conjuncts = list(conjuncts)
-
-    def __eq__(self, other):
-        return isinstance(other, And) and self.conjuncts == other.conjuncts
-
-    def __hash__(self):
-        return hash(
-            ("and", tuple(hash(conjunct) for conjunct in self.conjuncts))
+        self.conjuncts = conjuncts
+        self.symbol_set = frozenset().union(
+            *[conjunct.symbol_set for conjunct in conjuncts]
+        )
+        self.depth = 1 + max(
+            [conjunct.depth for conjunct in conjuncts], default=0
         )
+        self.size = 1 + sum(conjunct.size for conjunct in conjuncts)
 
     def __repr__(self):
         conjunctions = ", ".join(
@@ -114,35 +301,105 @@ class And(Sentence):
         return f"And({conjunctions})"
 
     def add(self, conjunct):
+        """
+        Sentences are shared and immutable, so a conjunction cannot be
+        added to in place: rebind to `extended` instead, or tell a
+        KnowledgeBase.
+        """
+        raise Exception(
+            "And is immutable: use `knowledge = knowledge.extended(sentence)`"
+            " instead of `knowledge.add(sentence)`"
+        )
+
+    def extended(self, conjunct):
+        """Returns a new conjunction with `conjunct` appended."""
         Sentence.validate(conjunct)
-        self.conjuncts.append(conjunct)
+        return And(*self.conjuncts, conjunct)
+
+    @classmethod
+    def combine(cls, conjuncts):
+        """Returns the simplified conjunction of simplified `conjuncts`."""
+        flat = dict()
+        for conjunct in conjuncts:
+            if conjunct is FALSE:
+                return FALSE
+            for c in (conjunct.conjuncts if isinstance(conjunct, And)
+                      else [conjunct]):
+                if isinstance(c, Not) and c.operand in flat:
+                    return FALSE
+                if Not(c) in flat:
+                    return FALSE
+                flat[c] = True
+        if len(flat) == 1:
+            return next(iter(flat))
+        return And(*flat)
+
+    def simplification(self):
+        return And.combine(
+            [conjunct.simplify() for conjunct in self.conjuncts]
+        )
+
+    def simplify_negation(self):
+        return Or.combine(
+            [conjunct.simplify_negation() for conjunct in self.conjuncts]
+        )
 
     def evaluate(self, model):
         return all(conjunct.evaluate(model) for conjunct in self.conjuncts)
 
+    def evaluate_partial(self, model):
+        result = True
+        for conjunct in self.conjuncts:
+            value = conjunct.evaluate_partial(model)
+            if value is False:
+                return False
+            if value is None:
+                result = None
+        return result
+
     def formula(self):
         if len(self.conjuncts) == 1:
             return self.conjuncts[0].formula()
         return " ∧ ".join([Sentence.parenthesize(conjunct.formula())
                            for conjunct in self.conjuncts])
 
-    def symbols(self):
-        return set.union(*[conjunct.symbols() for conjunct in self.conjuncts])
+    def encode(self, cnf):
+        return cnf.conjunction(
+            [cnf.literal(conjunct) for conjunct in self.conjuncts]
+        )
+
+    def expression(self, index):
+        if not self.conjuncts:
+            return "True"
+        return "(" + " and ".join(
+            [conjunct.expression(index) for conjunct in self.conjuncts]
+        ) + ")"
+
+    def table(self, columns):
+        result = ~np.zeros_like(next(iter(columns.values())))
+        for conjunct in self.conjuncts:
+            result &= conjunct.table(columns)
+        return result
+
+    def diagram(self, bdd):
+        result = BDD.TRUE
+        for conjunct in self.conjuncts:
+            result = bdd.ite(result, bdd.node(conjunct), BDD.FALSE)
+        return result
 
 
 class Or(Sentence):
-    def __init__(self, *disjuncts):
+    def initialize(self, *disjuncts):
         for disjunct in disjuncts:
             Sentence.validate(disjunct)
-        self.disjuncts = list(disjuncts)
-
-    def __eq__(self, other):
-        return isinstance(other, Or) and self.disjuncts == other.disjuncts
-
-    def __hash__(self):
-        return hash(
-            ("or", tuple(hash(disjunct) for disjunct in self.disjuncts))
+        self.disjuncts = disjuncts
+        self.symbol_set = frozenset().union(
+            *[disjunct.symbol_set for disjunct in disjuncts]
         )
+        self.depth = 1 + max(
+            [disjunct.depth for disjunct in disjuncts], default=0
+        )
+        self.size = 1 + sum(disjunct.size for disjunct in disjuncts)
 
     def __repr__(self):
         disjuncts = ", ".join([str(disjunct) for disjunct in self.disjuncts])
@@ -151,30 +408,84 @@ class Or(Sentence):
     def evaluate(self, model):
         return any(disjunct.evaluate(model) for disjunct in self.disjuncts)
 
+    @classmethod
+    def combine(cls, disjuncts):
+        """Returns the simplified disjunction of simplified `disjuncts`."""
+        flat = dict()
+        for disjunct in disjuncts:
+            if disjunct is TRUE:
+                return TRUE
+            for d in (disjunct.disjuncts if isinstance(disjunct, Or)
+                      else [disjunct]):
+                if isinstance(d, Not) and d.operand in flat:
+                    return TRUE
+                if Not(d) in flat:
+                    return TRUE
+                flat[d] = True
+        if len(flat) == 1:
+            return next(iter(flat))
+        return Or(*flat)
+
+    def simplification(self):
+        return Or.combine(
+            [disjunct.simplify() for disjunct in self.disjuncts]
+        )
+
+    def simplify_negation(self):
+        return And.combine(
+            [disjunct.simplify_negation() for disjunct in self.disjuncts]
+        )
+
+    def evaluate_partial(self, model):
+        result = False
+        for disjunct in self.disjuncts:
+            value = disjunct.evaluate_partial(model)
+            if value is True:
+                return True
+            if value is None:
+                result = None
+        return result
+
     def formula(self):
         if len(self.disjuncts) == 1:
             return self.disjuncts[0].formula()
         return " ∨  ".join([Sentence.parenthesize(disjunct.formula())
                             for disjunct in self.disjuncts])
 
-    def symbols(self):
-        return set.union(*[disjunct.symbols() for disjunct in self.disjuncts])
+    def encode(self, cnf):
+        return cnf.disjunction(
+            [cnf.literal(disjunct) for disjunct in self.disjuncts]
+        )
+
+    def expression(self, index):
+        if not self.disjuncts:
+            return "False"
+        return "(" + " or ".join(
+            [disjunct.expression(index) for disjunct in self.disjuncts]
+        ) + ")"
+
+    def table(self, columns):
+        result = np.zeros_like(next(iter(columns.values())))
+        for disjunct in self.disjuncts:
+            result |= disjunct.table(columns)
+        return result
+
+    def diagram(self, bdd):
+        result = BDD.FALSE
+        for disjunct in self.disjuncts:
+            result = bdd.ite(result, BDD.TRUE, bdd.node(disjunct))
+        return result
 
 
 class Implication(Sentence):
-    def __init__(self, antecedent, consequent):
+    def initialize(self, antecedent, consequent):
         Sentence.validate(antecedent)
         Sentence.validate(consequent)
         self.antecedent = antecedent
         self.consequent = consequent
-
-    def __eq__(self, other):
-        return (isinstance(other, Implication)
-                and self.antecedent == other.antecedent
-                and self.consequent == other.consequent)
-
-    def __hash__(self):
-        return hash(("implies", hash(self.antecedent), hash(self.consequent)))
+        self.symbol_set = antecedent.symbol_set | consequent.symbol_set
+        self.depth = 1 + max(antecedent.depth, consequent.depth)
+        self.size = 1 + antecedent.size + consequent.size
 
     def __repr__(self):
         return f"Implication({self.antecedent}, {self.consequent})"
@@ -183,29 +494,60 @@ class Implication(Sentence):
         return ((not self.antecedent.evaluate(model))
                 or self.consequent.evaluate(model))
 
+    def evaluate_partial(self, model):
+        antecedent = self.antecedent.evaluate_partial(model)
+        if antecedent is False:
+            return True
+        consequent = self.consequent.evaluate_partial(model)
+        if consequent is True:
+            return True
+        if antecedent is True and consequent is False:
+            return False
+        return None
+
+    def simplification(self):
+        return Or.combine([
+            self.antecedent.simplify_negation(), self.consequent.simplify()
+        ])
+
+    def simplify_negation(self):
+        return And.combine([
+            self.antecedent.simplify(), self.consequent.simplify_negation()
+        ])
+
     def formula(self):
         antecedent = Sentence.parenthesize(self.antecedent.formula())
         consequent = Sentence.parenthesize(self.consequent.formula())
         return f"{antecedent} => {consequent}"
 
-    def symbols(self):
-        return set.union(self.antecedent.symbols(), self.consequent.symbols())
+    def encode(self, cnf):
+        return cnf.disjunction(
+            [-cnf.literal(self.antecedent), cnf.literal(self.consequent)]
+        )
+
+    def expression(self, index):
+        antecedent = self.antecedent.expression(index)
+        consequent = self.consequent.expression(index)
+        return f"(not {antecedent} or {consequent})"
+
+    def table(self, columns):
+        return ~self.antecedent.table(columns) | self.consequent.table(columns)
+
+    def diagram(self, bdd):
+        return bdd.ite(
+            bdd.node(self.antecedent), bdd.node(self.consequent), BDD.TRUE
+        )
 
 
 class Biconditional(Sentence):
-    def __init__(self, left, right):
+    def initialize(self, left, right):
         Sentence.validate(left)
         Sentence.validate(right)
         self.left = left
         self.right = right
-
-    def __eq__(self, other):
-        return (isinstance(other, Biconditional)
-                and self.left == other.left
-                and self.right == other.right)
-
-    def __hash__(self):
-        return hash(("biconditional", hash(self.left), hash(self.right)))
+        self.symbol_set = left.symbol_set | right.symbol_set
+        self.depth = 1 + max(left.depth, right.depth)
+        self.size = 1 + left.size + right.size
 
     def __repr__(self):
         return f"Biconditional({self.left}, {self.right})"
@@ -216,48 +558,984 @@ class Biconditional(Sentence):
                 or (not self.left.evaluate(model)
                     and not self.right.evaluate(model)))
 
+    def evaluate_partial(self, model):
+        left = self.left.evaluate_partial(model)
+        if left is None:
+            return None
+        right = self.right.evaluate_partial(model)
+        if right is None:
+            return None
+        return left == right
+
+    @classmethod
+    def combine(cls, left, right):
+        """Returns the simplified biconditional of simplified sides."""
+        if left is right:
+            return TRUE
+        if Not(left) is right or Not(right) is left:
+            return FALSE
+        for constant, other in [(left, right), (right, left)]:
+            if constant is TRUE:
+                return other
+            if constant is FALSE:
+                return other.simplify_negation()
+        return Biconditional(left, right)
+
+    def simplification(self):
+        return Biconditional.combine(self.left.simplify(), self.right.simplify())
+
+    def simplify_negation(self):
+        return Biconditional.combine(
+            self.left.simplify(), self.right.simplify_negation()
+        )
+
     def formula(self):
         left = Sentence.parenthesize(str(self.left))
         right = Sentence.parenthesize(str(self.right))
         return f"{left} <=> {right}"
 
-    def symbols(self):
-        return set.union(self.left.symbols(), self.right.symbols())
+    def encode(self, cnf):
+        return cnf.equivalence(cnf.literal(self.left), cnf.literal(self.right))
+
+    def expression(self, index):
+        left = self.left.expression(index)
+        right = self.right.expression(index)
+        return f"((not {left}) == (not {right}))"
+
+    def table(self, columns):
+        return ~(self.left.table(columns) ^ self.right.table(columns))
+
+    def diagram(self, bdd):
+        right = bdd.node(self.right)
+        return bdd.ite(bdd.node(self.left), right, bdd.negate(right))
+
+
+# Constants: the empty conjunction is true, the empty disjunction false
+TRUE = And()
+FALSE = Or()
+
+# Deeper or larger sentences are evaluated rather than compiled: the
+# Python parser rejects nesting beyond about 100 connectives
+COMPILE_DEPTH_LIMIT = 64
+COMPILE_SIZE_LIMIT = 10000
+
+# Above this many symbols model_check hands over to the SAT solver
+ENUMERATION_LIMIT = 16
+
+# With NumPy, truth tables replace enumeration and search from this many
+# symbols up to ENUMERATION_LIMIT; beyond that the SAT solver is faster
+TRUTH_TABLE_MINIMUM = 8
+
+# Truth tables are built this many 64-model words at a time
+TRUTH_TABLE_CHUNK = 2 ** 14
+
+# Parallel enumeration checks for refutations from other workers this often
+PARALLEL_POLL = 2 ** 12
+
+# Packed columns of the six symbols that vary within a 64-model word
+WORD_PATTERNS = [
+    0xAAAAAAAAAAAAAAAA, 0xCCCCCCCCCCCCCCCC, 0xF0F0F0F0F0F0F0F0,
+    0xFF00FF00FF00FF00, 0xFFFF0000FFFF0000, 0xFFFFFFFF00000000
+]
+
+
+class BDD():
+    """
+    Reduced ordered binary decision diagram of a sentence. Nodes are ints:
+    0 and 1 are the terminals, and every other node tests one variable
+    level and is unique in the table. Further sentences, such as queries,
+    are built into the same diagram, sharing the table and the cache of
+    if-then-else operations.
+    """
+
+    FALSE = 0
+    TRUE = 1
+
+    def __init__(self, sentence, order=None):
+        self.order = list(order or BDD.symbol_order(sentence))
+        self.levels = {symbol: i for i, symbol in enumerate(self.order)}
+        self.nodes = [(None, None, None), (None, None, None)]
+        self.unique = dict()
+        self.cache = dict()
+        self.built = dict()
+        self.root = self.node(sentence)
+
+        # Levels of the sentence itself: queries may add more below these
+        self.width = len(self.order)
+
+    @staticmethod
+    def symbol_order(sentence):
+        """
+        Orders symbols by first appearance in a depth-first walk, which
+        keeps symbols that are used together at neighbouring levels.
+        """
+        order = dict()
+        stack = [sentence]
+        while stack:
+            sentence = stack.pop()
+            if isinstance(sentence, Symbol):
+                order.setdefault(sentence.name, None)
+            else:
+                stack.extend(reversed(sentence.arguments))
+        return list(order)
+
+    def __len__(self):
+        """Returns the number of nodes reachable from the root."""
+        return len(self.reachable(self.root))
+
+    def level(self, u):
+        """Returns the variable level tested by node `u`."""
+        if u <= BDD.TRUE:
+            return len(self.order)
+        return self.nodes[u][0]
+
+    def sentence_level(self, u):
+        """
+        Returns the level of `u` among the levels of the sentence alone,
+        where terminals come right after its last symbol.
+        """
+        return min(self.level(u), self.width)
+
+    def make(self, level, low, high):
+        """Returns the unique node testing `level` with these children."""
+        if low == high:
+            return low
+        key = (level, low, high)
+        if key not in self.unique:
+            self.unique[key] = len(self.nodes)
+            self.nodes.append(key)
+        return self.unique[key]
+
+    def variable(self, name):
+        """Returns the node for symbol `name`, adding a level if new."""
+        if name not in self.levels:
+            self.levels[name] = len(self.order)
+            self.order.append(name)
+        return self.make(self.levels[name], BDD.FALSE, BDD.TRUE)
+
+    def node(self, sentence):
+        """Returns the node for `sentence`, building it once."""
+        if sentence not in self.built:
+            self.built[sentence] = sentence.diagram(self)
+        return self.built[sentence]
+
+    def negate(self, u):
+        return self.ite(u, BDD.FALSE, BDD.TRUE)
+
+    def cofactors(self, u, level):
+        """Returns the children of `u` on `level`, or `u` twice if skipped."""
+        if u <= BDD.TRUE or self.nodes[u][0] != level:
+            return u, u
+        return self.nodes[u][1], self.nodes[u][2]
+
+    def ite(self, f, g, h):
+        """Returns the node for if `f` then `g` else `h`."""
+        if f == BDD.TRUE or g == h:
+            return g
+        if f == BDD.FALSE:
+            return h
+        if g == BDD.TRUE and h == BDD.FALSE:
+            return f
+        key = (f, g, h)
+        if key not in self.cache:
+            level = min(self.level(f), self.level(g), self.level(h))
+            f0, f1 = self.cofactors(f, level)
+            g0, g1 = self.cofactors(g, level)
+            h0, h1 = self.cofactors(h, level)
+            self.cache[key] = self.make(
+                level, self.ite(f0, g0, h0), self.ite(f1, g1, h1)
+            )
+        return self.cache[key]
+
+    def reachable(self, u):
+        """Returns the non-terminal nodes reachable from `u`, in order."""
+        seen = dict()
+        stack = [u]
+        while stack:
+            u = stack.pop()
+            if u > BDD.TRUE and u not in seen:
+                seen[u] = None
+                stack.extend(self.nodes[u][1:])
+        return list(seen)
+
+    def entails(self, query):
+        """Checks if the sentence entails `query`."""
+        return self.ite(self.root, self.node(query), BDD.TRUE) == BDD.TRUE
+
+    def count(self):
+        """
+        Returns the number of models of the sentence over its symbols (or
+        the given order), ignoring symbols that only queries brought in.
+        """
+        level = self.sentence_level
+        counts = {BDD.FALSE: 0, BDD.TRUE: 1}
+        for u in sorted(self.reachable(self.root),
+                        key=lambda u: -self.nodes[u][0]):
+            at, low, high = self.nodes[u]
+            counts[u] = (counts[low] * 2 ** (level(low) - at - 1)
+                         + counts[high] * 2 ** (level(high) - at - 1))
+        return counts[self.root] * 2 ** level(self.root)
+
+    def forced(self):
+        """
+        Returns a dict mapping each symbol whose value is the same in every
+        model of the sentence to that value. An unsatisfiable sentence
+        forces nothing.
+        """
+        if self.root == BDD.FALSE:
+            return dict()
+
+        # Levels some model sets true, sets false, or leaves free
+        can_true = set()
+        can_false = set()
+        skipped = [0] * (self.width + 1)
+        skipped[0] += 1
+        skipped[self.sentence_level(self.root)] -= 1
+        for u in self.reachable(self.root):
+            level, low, high = self.nodes[u]
+            for child, values in [(low, can_false), (high, can_true)]:
+                if child != BDD.FALSE:
+                    values.add(level)
+                    skipped[level + 1] += 1
+                    skipped[self.sentence_level(child)] -= 1
+
+        forced = dict()
+        free = 0
+        for level, symbol in enumerate(self.order[:self.width]):
+            free += skipped[level]
+            if free == 0 and (level in can_true) != (level in can_false):
+                forced[symbol] = level in can_true
+        return forced
+
+
+class CNF():
+    """
+    Conjunctive normal form built by Tseitin encoding of sentences.
+    Variables are positive integers and literals are signed integers,
+    so every clause is a list of non-zero ints.
+    """
+
+    def __init__(self):
+        self.variables = dict()
+        self.clauses = []
+        self.count = 0
+        self.encoded = dict()
+
+    def fresh(self):
+        """Returns a new auxiliary variable."""
+        self.count += 1
+        return self.count
+
+    def variable(self, name):
+        """Returns the variable standing for symbol `name`."""
+        if name not in self.variables:
+            self.variables[name] = self.fresh()
+        return self.variables[name]
+
+    def literal(self, sentence):
+        """Returns a literal equivalent to `sentence`, encoding it once."""
+        Sentence.validate(sentence)
+        if sentence not in self.encoded:
+            self.encoded[sentence] = sentence.encode(self)
+        return self.encoded[sentence]
+
+    def add(self, sentence):
+        """Adds clauses asserting that `sentence` is true."""
+        literal = self.literal(sentence)
+        self.clauses.append([literal])
+        return literal
+
+    def conjunction(self, literals):
+        """Returns a variable equivalent to the conjunction of `literals`."""
+        x = self.fresh()
+        for literal in literals:
+            self.clauses.append([-x, literal])
+        self.clauses.append([x] + [-literal for literal in literals])
+        return x
+
+    def disjunction(self, literals):
+        """Returns a variable equivalent to the disjunction of `literals`."""
+        x = self.fresh()
+        for literal in literals:
+            self.clauses.append([x, -literal])
+        self.clauses.append([-x] + list(literals))
+        return x
+
+    def equivalence(self, a, b):
+        """Returns a variable equivalent to `a` <=> `b`."""
+        x = self.fresh()
+        self.clauses.extend([
+            [-x, -a, b], [-x, a, -b], [x, a, b], [x, -a, -b]
+        ])
+        return x
+
+
+class SATSolver():
+    """
+    CDCL satisfiability solver: DPLL search with two watched literals for
+    unit propagation, first-UIP clause learning and non-chronological
+    backjumping. Clauses can be added between calls to `solve`, and
+    learned clauses are kept, so one solver can answer many queries.
+    """
+
+    def __init__(self, clauses=()):
+        self.ok = True
+        self.clauses = []
+        self.watches = dict()
+        self.values = dict()
+        self.level = dict()
+        self.reason = dict()
+        self.activity = dict()
+        self.polarity = dict()
+        self.increment = 1.0
+        self.trail = []
+        self.trail_lim = []
+        self.head = 0
+        self.conflicts = 0
+        self.decisions = 0
+        for clause in clauses:
+            self.add_clause(clause)
+
+    def new_variable(self, var):
+        """Registers `var` with the solver if not already known."""
+        if var not in self.activity:
+            self.activity[var] = 0.0
+            self.watches[var] = []
+            self.watches[-var] = []
+
+    def value(self, literal):
+        """Returns the truth value of `literal`, or None if unassigned."""
+        value = self.values.get(abs(literal))
+        if value is None:
+            return None
+        return value if literal > 0 else not value
+
+    def add_clause(self, clause):
+        """Adds a clause; returns False once the clauses are unsatisfiable."""
+        if not self.ok:
+            return False
+        self.cancel_until(0)
+        literals = []
+        for literal in clause:
+            self.new_variable(abs(literal))
+            value = self.value(literal)
+            if value is True or -literal in literals:
+                return True
+            if value is None and literal not in literals:
+                literals.append(literal)
+        if not literals:
+            self.ok = False
+        elif len(literals) == 1:
+            self.assign(literals[0], None)
+            self.ok = self.propagate() is None
+        else:
+            self.attach(literals)
+        return self.ok
+
+    def attach(self, clause):
+        self.clauses.append(clause)
+        self.watches[clause[0]].append(clause)
+        self.watches[clause[1]].append(clause)
+
+    def assign(self, literal, reason):
+        var = abs(literal)
+        self.values[var] = literal > 0
+        self.level[var] = len(self.trail_lim)
+        self.reason[var] = reason
+        self.trail.append(literal)
+
+    def cancel_until(self, level):
+        """Undoes every assignment made above decision level `level`."""
+        if len(self.trail_lim) <= level:
+            return
+        for literal in self.trail[self.trail_lim[level]:]:
+            var = abs(literal)
+            self.polarity[var] = literal > 0
+            del self.values[var]
+        del self.trail[self.trail_lim[level]:]
+        del self.trail_lim[level:]
+        self.head = len(self.trail)
+
+    def propagate(self):
+        """Runs unit propagation; returns a conflicting clause or None."""
+        while self.head < len(self.trail):
+            false_literal = -self.trail[self.head]
+            self.head += 1
+            watching = self.watches[false_literal]
+            kept = []
+            for index, clause in enumerate(watching):
+                if clause[0] == false_literal:
+                    clause[0], clause[1] = clause[1], clause[0]
+                if self.value(clause[0]) is True:
+                    kept.append(clause)
+                    continue
+                for k in range(2, len(clause)):
+                    if self.value(clause[k]) is not False:
+                        clause[1], clause[k] = clause[k], clause[1]
+                        self.watches[clause[1]].append(clause)
+                        break
+                else:
+                    kept.append(clause)
+                    if self.value(clause[0]) is False:
+                        kept.extend(watching[index + 1:])
+                        self.watches[false_literal] = kept
+                        return clause
+                    self.assign(clause[0], clause)
+            self.watches[false_literal] = kept
+        return None
+
+    def analyze(self, conflict):
+        """Returns the first-UIP learned clause and the level to jump to."""
+        seen = set()
+        learned = [None]
+        pending = 0
+        literal = None
+        index = len(self.trail) - 1
+        clause = conflict
+        current = len(self.trail_lim)
+        while True:
+            for other in clause:
+                var = abs(other)
+                if literal is not None and var == abs(literal):
+                    continue
+                if var not in seen and self.level[var] > 0:
+                    seen.add(var)
+                    self.bump(var)
+                    if self.level[var] == current:
+                        pending += 1
+                    else:
+                        learned.append(other)
+            while abs(self.trail[index]) not in seen:
+                index -= 1
+            literal = self.trail[index]
+            index -= 1
+            pending -= 1
+            if pending == 0:
+                break
+            clause = self.reason[abs(literal)]
+        learned[0] = -literal
+
+        # Watch the literal assigned at the highest remaining level
+        if len(learned) == 1:
+            return learned, 0
+        highest = max(range(1, len(learned)),
+                      key=lambda i: self.level[abs(learned[i])])
+        learned[1], learned[highest] = learned[highest], learned[1]
+        return learned, self.level[abs(learned[1])]
+
+    def bump(self, var):
+        self.activity[var] += self.increment
+        if self.activity[var] > 1e100:
+            for other in self.activity:
+                self.activity[other] *= 1e-100
+            self.increment *= 1e-100
+
+    def decide(self):
+        """Returns the unassigned variable with the highest activity."""
+        best, best_activity = None, -1.0
+        for var, activity in self.activity.items():
+            if activity > best_activity and var not in self.values:
+                best, best_activity = var, activity
+        return best
+
+    def solve(self, assumptions=()):
+        """
+        Searches for a model of the clauses in which every literal of
+        `assumptions` holds. Returns a dict mapping variables to booleans,
+        or None if there is no such model.
+        """
+        if not self.ok:
+            return None
+        for literal in assumptions:
+            self.new_variable(abs(literal))
+        self.cancel_until(0)
+        try:
+            while True:
+                conflict = self.propagate()
+                if conflict is not None:
+                    self.conflicts += 1
+                    if not self.trail_lim:
+                        self.ok = False
+                        return None
+                    learned, level = self.analyze(conflict)
+                    self.cancel_until(level)
+                    if len(learned) == 1:
+                        self.assign(learned[0], None)
+                    else:
+                        self.attach(learned)
+                        self.assign(learned[0], learned)
+                    self.increment /= 0.95
+                    continue
+
+                # Assumptions are decided first, one per decision level
+                literal = None
+                while len(self.trail_lim) < len(assumptions):
+                    assumption = assumptions[len(self.trail_lim)]
+                    value = self.value(assumption)
+                    if value is False:
+                        return None
+                    self.trail_lim.append(len(self.trail))
+                    if value is None:
+                        literal = assumption
+                        break
+                if literal is None:
+                    var = self.decide()
+                    if var is None:
+                        return dict(self.values)
+                    self.decisions += 1
+                    self.trail_lim.append(len(self.trail))
+                    literal = var if self.polarity.get(var, False) else -var
+                self.assign(literal, None)
+        finally:
+            self.cancel_until(0)
+
+
+class KnowledgeBase():
+    """
+    Knowledge base built up with `tell` and queried with `ask`.
+    Clauses, learned clauses and answers are kept between calls: a new
+    sentence keeps every entailment, and only drops a non-entailment
+    whose counter-model the sentence does not satisfy.
+    """
+
+    def __init__(self, *sentences):
+        self.sentences = []
+        self.cnf = CNF()
+        self.solver = SATSolver()
+        self.synced = 0
+        self.entailed = set()
+        self.counter_models = dict()
+        for sentence in sentences:
+            self.tell(sentence)
+
+    def knowledge(self):
+        """Returns the conjunction of every sentence told so far."""
+        return And(*self.sentences)
+
+    def sync(self):
+        """Passes clauses added to the CNF since the last call to the solver."""
+        for clause in self.cnf.clauses[self.synced:]:
+            self.solver.add_clause(clause)
+        self.synced = len(self.cnf.clauses)
+
+    def tell(self, sentence):
+        """Adds `sentence` to the knowledge base."""
+        Sentence.validate(sentence)
+        self.sentences.append(sentence)
+        self.cnf.add(sentence)
+        self.sync()
+        for query, model in list(self.counter_models.items()):
+            if sentence.evaluate_partial(model) is not True:
+                del self.counter_models[query]
+
+    def ask(self, query):
+        """Checks if the knowledge base entails `query`."""
+        if query in self.entailed:
+            return True
+        if query in self.counter_models:
+            return False
+        literal = self.cnf.literal(query)
+        self.sync()
+        model = self.solver.solve([-literal])
+        if model is None:
+            self.entailed.add(query)
+            return True
+
+        # Symbols the solver never saw are unconstrained, any value will do
+        self.counter_models[query] = {
+            name: model.get(var, False)
+            for name, var in self.cnf.variables.items()
+        }
+        return False
 
 
 def model_check(knowledge, query):
     """Checks if knowledge base entails query."""
-
-    def check_all(knowledge, query, symbols, model):
-        """Checks if knowledge base entails query, given a particular model."""
-
-        # If model has an assignment for each symbol
-        if not symbols:
-
-            # If knowledge base is true in model, then query must also be true
-            if knowledge.evaluate(model):
-                return query.evaluate(model)
+    return model_check_many(knowledge, [query])[0]
+
+
+def model_check_many(knowledge, queries, evaluated=None):
+    """
+    Checks which of `queries` the knowledge base entails, sharing one pass
+    over the models of the knowledge base. Returns a list of booleans.
+    Sentences are simplified first. Problems over more than 16 symbols
+    are decided by the SAT solver. Below that, problems of 8 symbols or
+    more are evaluated as NumPy truth tables when available, or searched
+    with pruning otherwise, and smaller ones enumerate every model.
+
+    If `evaluated` is a list, it is filled with the number of models each
+    query was evaluated in.
+    """
+    knowledge = knowledge.simplify()
+    queries = [query.simplify() for query in queries]
+    symbols = knowledge.symbols().union(
+        *[query.symbols() for query in queries]
+    )
+    if len(symbols) > ENUMERATION_LIMIT:
+        return model_check_sat(knowledge, queries, evaluated)
+    if len(symbols) >= TRUTH_TABLE_MINIMUM:
+        if np is not None:
+            return model_check_truth_table(knowledge, queries, evaluated)
+        return model_check_search(knowledge, queries, evaluated)
+    return model_check_enumeration(knowledge, queries, evaluated)
+
+
+def model_check_sat(knowledge, queries, evaluated=None):
+    """
+    Checks each query as unsatisfiability of knowledge ∧ ¬query, with one
+    incremental solver for the knowledge base. Models found along the
+    way also settle every other query they falsify.
+    """
+    cnf = CNF()
+    cnf.add(knowledge)
+    literals = [cnf.literal(query) for query in queries]
+    solver = SATSolver(cnf.clauses)
+
+    results = [None] * len(queries)
+    counts = [0] * len(queries)
+    for i, literal in enumerate(literals):
+        if results[i] is not None:
+            continue
+        model = solver.solve([-literal])
+        if model is None:
+            results[i] = True
+            continue
+        for j in range(i, len(literals)):
+            if results[j] is not None:
+                continue
+            counts[j] += 1
+            value = model.get(abs(literals[j]))
+            if value is not None and value != (literals[j] > 0):
+                results[j] = False
+    if evaluated is not None:
+        evaluated[:] = counts
+    return results
+
+
+def symbol_frequencies(sentences):
+    """
+    Counts how many distinct sentence nodes reference each symbol,
+    across all of `sentences`.
+    """
+    counts = dict()
+    seen = set()
+    stack = list(sentences)
+    while stack:
+        sentence = stack.pop()
+        if sentence in seen:
+            continue
+        seen.add(sentence)
+        for child in sentence.arguments:
+            if isinstance(child, Symbol):
+                counts[child.name] = counts.get(child.name, 0) + 1
+            elif isinstance(child, Sentence):
+                stack.append(child)
+    for sentence in sentences:
+        if isinstance(sentence, Symbol):
+            counts[sentence.name] = counts.get(sentence.name, 0) + 1
+    return counts
+
+
+def model_check_search(knowledge, queries, evaluated=None):
+    """
+    Checks which queries the knowledge base entails by searching partial
+    models, most frequent symbols first. A subtree is pruned as soon as
+    the knowledge base is false in it, or every open query is true.
+    One model is assigned and unassigned in place as the search backtracks.
+    """
+    frequencies = symbol_frequencies([knowledge] + queries)
+    symbols = sorted(frequencies,
+                     key=lambda symbol: (-frequencies[symbol], symbol))
+    results = [True] * len(queries)
+    counts = [0] * len(queries)
+    model = dict()
+
+    def check_all(pending, depth):
+        """Refutes pending queries with a model extending `model`."""
+
+        # Nothing below can refute a query if knowledge base is false
+        knowledge_value = knowledge.evaluate_partial(model)
+        if knowledge_value is False:
+            return
+
+        # Only queries not yet refuted and not already true stay open
+        remaining = []
+        for i in pending:
+            if not results[i]:
+                continue
+            counts[i] += 1
+            value = queries[i].evaluate_partial(model)
+            if value is False and knowledge_value is True:
+                results[i] = False
+            elif value is not True:
+                remaining.append(i)
+        if not remaining:
+            return
+
+        # Try the next most frequent symbol both ways, then unassign it
+        p = symbols[depth]
+        for value in (True, False):
+            model[p] = value
+            check_all(remaining, depth + 1)
+        del model[p]
+
+    check_all(range(len(queries)), 0)
+    if evaluated is not None:
+        evaluated[:] = counts
+    return results
+
+
+def model_check_enumeration(knowledge, queries, evaluated=None):
+    """
+    Checks which queries the knowledge base entails by enumerating
+    all models once.
+    """
+
+    # Get all symbols in both knowledge and queries
+    symbols = sorted(knowledge.symbols().union(
+        *[query.symbols() for query in queries]
+    ))
+
+    # Compile all sentences to functions over an int model
+    knowledge = knowledge.compile(symbols)
+    undecided = {i: query.compile(symbols) for i, query in enumerate(queries)}
+    results = [True] * len(queries)
+    counts = [0] * len(queries)
+
+    # Each int below 2^n is one model, bit i assigning symbols[i]
+    for model in range(2 ** len(symbols)):
+        if not undecided:
+            break
+
+        # If knowledge base is true in model, then queries must also be true
+        if knowledge(model):
+            for i, query in list(undecided.items()):
+                counts[i] += 1
+                if not query(model):
+                    results[i] = False
+                    del undecided[i]
+    if evaluated is not None:
+        evaluated[:] = counts
+    return results
+
+
+def model_check_truth_table(knowledge, queries, evaluated=None):
+    """
+    Checks which queries the knowledge base entails by evaluating all
+    sentences over a bit-packed truth table, one chunk of models at a
+    time. Requires NumPy.
+    """
+    if np is None:
+        raise Exception("truth tables require numpy")
+
+    # Get all symbols in both knowledge and queries
+    symbols = sorted(knowledge.symbols().union(
+        *[query.symbols() for query in queries]
+    ))
+
+    # Without symbols there are no columns to tabulate, only one model
+    if not symbols:
+        return model_check_enumeration(knowledge, queries, evaluated)
+
+    undecided = dict(enumerate(queries))
+    results = [True] * len(queries)
+    counts = [0] * len(queries)
+
+    # Model m is bit m % 64 of word m // 64
+    words = max(1, 2 ** len(symbols) // 64)
+    for start in range(0, words, TRUTH_TABLE_CHUNK):
+        if not undecided:
+            break
+        index = np.arange(start, min(start + TRUTH_TABLE_CHUNK, words),
+                          dtype=np.uint64)
+
+        # Low symbols repeat within a word, high symbols follow the index
+        columns = dict()
+        for i, symbol in enumerate(symbols):
+            if i < 6:
+                columns[symbol] = np.full(
+                    len(index), WORD_PATTERNS[i], dtype=np.uint64
+                )
+            else:
+                bit = (index >> np.uint64(i - 6)) & np.uint64(1)
+                columns[symbol] = np.uint64(0) - bit
+
+        # Any model of the knowledge base falsifying a query is a counter
+        models = knowledge.table(columns)
+        size = min(64 * len(index), 2 ** len(symbols))
+        for i, query in list(undecided.items()):
+            counts[i] += size
+            if np.any(models & ~query.table(columns)):
+                results[i] = False
+                del undecided[i]
+    if evaluated is not None:
+        evaluated[:] = counts
+    return results
+
+
+def model_check_parallel(knowledge, queries, processes=None, split=None,
+                         evaluated=None):
+    """
+    Checks which queries the knowledge base entails by enumerating all
+    models across a process pool. The first `split` symbols are fixed in
+    each of the 2^split sub-problems, and every worker stops as soon as
+    all queries have been refuted. This is brute force for cross-checking
+    the other backends, so model_check never picks it on its own.
+    """
+    queries = list(queries)
+    symbols = sorted(knowledge.symbols().union(
+        *[query.symbols() for query in queries]
+    ))
+    processes = processes or multiprocessing.cpu_count()
+    if split is None:
+        split = min(len(symbols), (4 * processes - 1).bit_length())
+    split = min(split, len(symbols))
+
+    # Workers share one flag per query, set when any of them refutes it
+    refuted = multiprocessing.Array("b", len(queries))
+    counts = [0] * len(queries)
+    with multiprocessing.Pool(
+        processes, initializer=parallel_setup,
+        initargs=(knowledge, queries, symbols, split, refuted)
+    ) as pool:
+        for task_counts in pool.imap_unordered(
+                parallel_check, range(2 ** split)):
+            counts = [a + b for a, b in zip(counts, task_counts)]
+            if all(refuted):
+                pool.terminate()
+                break
+    if evaluated is not None:
+        evaluated[:] = counts
+    return [not flag for flag in refuted]
+
+
+# State of a parallel enumeration worker, set once per process
+parallel_state = dict()
+
+
+def parallel_setup(knowledge, queries, symbols, split, refuted):
+    """Compiles the sentences once in each worker process."""
+    parallel_state["knowledge"] = knowledge.compile(symbols)
+    parallel_state["queries"] = [query.compile(symbols) for query in queries]
+    parallel_state["free"] = len(symbols) - split
+    parallel_state["refuted"] = refuted
+
+
+def parallel_check(prefix):
+    """
+    Enumerates every model whose top symbols are fixed to `prefix`,
+    flagging refuted queries. Returns the models evaluated per query.
+    """
+    knowledge = parallel_state["knowledge"]
+    queries = parallel_state["queries"]
+    refuted = parallel_state["refuted"]
+    free = parallel_state["free"]
+    counts = [0] * len(queries)
+    pending = [i for i in range(len(queries)) if not refuted[i]]
+
+    start = prefix << free
+    for offset in range(2 ** free):
+        if offset % PARALLEL_POLL == 0:
+            pending = [i for i in pending if not refuted[i]]
+        if not pending:
+            break
+        model = start + offset
+        if knowledge(model):
+            for i in list(pending):
+                counts[i] += 1
+                if not queries[i](model):
+                    refuted[i] = True
+                    pending.remove(i)
+    return counts
+
+
+def resolution_check(knowledge, query, statistics=None):
+    """
+    Checks if knowledge base entails query by resolution refutation over
+    the CNF clauses of knowledge ∧ ¬query, using the set of support
+    strategy: every resolvent descends from the negated query.
+    Tautologies are discarded, and clauses subsumed by a kept clause are
+    never added or are removed.
+
+    If `statistics` is a dict, it is filled with the number of clauses
+    generated and kept, and the seconds taken.
+    """
+    start = time.perf_counter()
+    cnf = CNF()
+    cnf.add(knowledge)
+    knowledge_clauses = list(cnf.clauses)
+    cnf.add(Not(query))
+    support_clauses = cnf.clauses[len(knowledge_clauses):]
+
+    generated = 0
+    usable = set()
+    index = dict()
+
+    def subsumed(clause):
+        """Checks if a usable clause is a subset of `clause`."""
+        for literal in clause:
+            for other in index.get(literal, ()):
+                if other <= clause:
+                    return True
+        return False
+
+    def keep(clause):
+        """Adds `clause` to the usable clauses, dropping those it subsumes."""
+        literal = min(clause, key=lambda l: len(index.get(l, ())))
+        for other in list(index.get(literal, ())):
+            if clause <= other:
+                usable.discard(other)
+                for l in other:
+                    index[l].discard(other)
+        usable.add(clause)
+        for l in clause:
+            index.setdefault(l, set()).add(clause)
+
+    def refute():
+        nonlocal generated
+
+        # Set of support is only complete over a satisfiable base
+        if SATSolver(knowledge_clauses).solve() is None:
             return True
-        else:
-
-            # Choose one of the remaining unused symbols
-            remaining = symbols.copy()
-            p = remaining.pop()
-
-            # Create a model where the symbol is true
-            model_true = model.copy()
-            model_true[p] = True
-
-            # Create a model where the symbol is false
-            model_false = model.copy()
-            model_false[p] = False
-
-            # Ensure entailment holds in both models
-            return (check_all(knowledge, query, remaining, model_true) and
-                    check_all(knowledge, query, remaining, model_false))
-
-    # Get all symbols in both knowledge and query
-    symbols = set.union(knowledge.symbols(), query.symbols())
 
-    # Check that knowledge entails query
-    return check_all(knowledge, query, symbols, dict())
+        for clause in knowledge_clauses:
+            clause = frozenset(clause)
+            if not any(-l in clause for l in clause) and not subsumed(clause):
+                keep(clause)
+
+        # Resolve the shortest supported clause against every usable one
+        support = []
+        queued = set()
+        for clause in support_clauses:
+            clause = frozenset(clause)
+            if clause not in queued:
+                queued.add(clause)
+                heapq.heappush(support, (len(clause), generated, clause))
+                generated += 1
+        while support:
+            _, _, given = heapq.heappop(support)
+            if subsumed(given):
+                continue
+            keep(given)
+            for literal in given:
+                for other in list(index.get(-literal, ())):
+                    resolvent = (given - {literal}) | (other - {-literal})
+                    generated += 1
+                    if not resolvent:
+                        return True
+                    if (resolvent in queued
+                            or any(-l in resolvent for l in resolvent)
+                            or subsumed(resolvent)):
+                        continue
+                    queued.add(resolvent)
+                    heapq.heappush(
+                        support, (len(resolvent), generated, resolvent)
+                    )
+        return False
+
+    result = refute()
+    if statistics is not None:
+        statistics["generated"] = generated
+        statistics["kept"] = len(usable)
+        statistics["seconds"] = time.perf_counter() - start
+    return result
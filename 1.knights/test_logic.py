@@ -0,0 +1,126 @@
+import itertools
+import random
+
+from logic import (
+    And, BDD, Biconditional, Implication, KnowledgeBase, Not, Or, Symbol,
+    model_check_enumeration, model_check_sat, model_check_search,
+    model_check_truth_table, resolution_check,
+)
+
+BACKENDS = [
+    model_check_sat, model_check_truth_table, model_check_search,
+    model_check_enumeration,
+]
+
+
+def random_sentence(symbols, pool, depth):
+    """
+    Return a random sentence over `symbols`, sometimes reusing one from
+    `pool` so that sentences share subterms, and adding it to `pool`.
+    """
+    if pool and random.random() < 0.2:
+        return random.choice(pool)
+    if depth == 0 or random.random() < 0.2:
+        return random.choice(symbols)
+    kind = random.randrange(5)
+    if kind == 0:
+        sentence = Not(random_sentence(symbols, pool, depth - 1))
+    elif kind in (1, 2):
+        connective = And if kind == 1 else Or
+        sentence = connective(*[
+            random_sentence(symbols, pool, depth - 1)
+            for _ in range(random.randint(0, 3))
+        ])
+    elif kind == 3:
+        sentence = Implication(random_sentence(symbols, pool, depth - 1),
+                               random_sentence(symbols, pool, depth - 1))
+    else:
+        sentence = Biconditional(random_sentence(symbols, pool, depth - 1),
+                                 random_sentence(symbols, pool, depth - 1))
+    pool.append(sentence)
+    return sentence
+
+
+def models(*sentences):
+    """Return every model over the symbols of `sentences`."""
+    names = sorted(set().union(*(s.symbols() for s in sentences)))
+    for values in itertools.product([False, True], repeat=len(names)):
+        yield dict(zip(names, values))
+
+
+def entails(knowledge, query):
+    """Check entailment by evaluating every model."""
+    return all(
+        query.evaluate(model)
+        for model in models(knowledge, query) if knowledge.evaluate(model)
+    )
+
+
+def random_case():
+    """Return random knowledge, queries and their symbols."""
+    symbols = [Symbol(f"S{i}") for i in range(random.randint(1, 9))]
+    pool = []
+    knowledge = And(*[
+        random_sentence(symbols, pool, 3) for _ in range(random.randint(0, 5))
+    ])
+    queries = [random_sentence(symbols, pool, 2) for _ in range(4)]
+    queries += [And(), Or(), random.choice(symbols)]
+    return symbols, knowledge, queries
+
+
+def test_backends_match_brute_force():
+    random.seed(0)
+    for _ in range(300):
+        _, knowledge, queries = random_case()
+        expected = [entails(knowledge, query) for query in queries]
+        for backend in BACKENDS:
+            assert backend(knowledge, queries) == expected
+        for query, answer in zip(queries, expected):
+            assert resolution_check(knowledge, query) == answer
+
+
+def test_backends_without_symbols():
+    for knowledge, query in itertools.product([And(), Or()], repeat=2):
+        expected = [entails(knowledge, query)]
+        for backend in BACKENDS:
+            assert backend(knowledge, [query]) == expected
+        assert resolution_check(knowledge, query) == expected[0]
+        assert KnowledgeBase(knowledge).ask(query) == expected[0]
+        assert BDD(knowledge).entails(query) == expected[0]
+
+
+def test_knowledge_base_matches_brute_force():
+    random.seed(1)
+    for _ in range(200):
+        symbols, _, queries = random_case()
+        pool = []
+        kb = KnowledgeBase()
+        told = []
+        for _ in range(random.randint(1, 5)):
+            for query in random.sample(queries, 3):
+                assert kb.ask(query) == entails(And(*told), query)
+            sentence = random_sentence(symbols, pool, 3)
+            kb.tell(sentence)
+            told.append(sentence)
+        for query in queries:
+            assert kb.ask(query) == entails(And(*told), query)
+
+
+def test_bdd_matches_brute_force():
+    random.seed(2)
+    for _ in range(300):
+        _, knowledge, queries = random_case()
+        bdd = BDD(knowledge)
+        for query in queries:
+            assert bdd.entails(query) == entails(knowledge, query)
+
+        # Queries may add levels, but count and forced keep to the sentence
+        satisfying = [m for m in models(knowledge) if knowledge.evaluate(m)]
+        assert bdd.count() == len(satisfying)
+        forced = dict()
+        if satisfying:
+            for name in knowledge.symbols():
+                values = {model[name] for model in satisfying}
+                if len(values) == 1:
+                    forced[name] = values.pop()
+        assert bdd.forced() == forced
@@ -1,6 +1,26 @@
+import heapq
 import itertools
+import json
+import logging
+import math
 import random
-from functools import reduce
+import time
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+logger = logging.getLogger(__name__)
+
+# Frontier components with more cells than this are not enumerated
+COMPONENT_LIMIT = 32
+
+# Seconds a random move may spend enumerating frontier components
+MOVE_TIME_LIMIT = 0.5
+
+# Random cells drawn before listing every unknown cell instead
+RANDOM_ATTEMPTS = 64
 
 
 class Minesweeper():
@@ -8,28 +28,46 @@ class Minesweeper():
     Minesweeper game representation
     """
 
-    def __init__(self, height=8, width=8, mines=8):
+    def __init__(self, height=8, width=8, mines=8, large=False):
+        """
+        With `large`, the board is a NumPy array and every neighbour
+        count is computed up front, for boards of a million cells or more.
+        """
 
         # Set initial width, height, and number of mines
         self.height = height
         self.width = width
         self.mines = set()
 
-        # Initialize an empty field with no mines
-        self.board = []
-        for i in range(self.height):
-            row = []
-            for j in range(self.width):
-                row.append(False)
-            self.board.append(row)
-
-        # Add mines randomly
-        while len(self.mines) != mines:
-            i = random.randrange(height)
-            j = random.randrange(width)
-            if not self.board[i][j]:
-                self.mines.add((i, j))
+        # Choose mine positions randomly, without replacement
+        positions = random.sample(range(height * width), mines)
+        for position in positions:
+            self.mines.add(divmod(position, width))
+
+        if large:
+            if np is None:
+                raise RuntimeError("large boards require numpy")
+            self.board = np.zeros((height, width), dtype=bool)
+            self.board.flat[positions] = True
+
+            # Sum the eight shifted copies of the board: a 3x3 convolution
+            padded = np.pad(self.board.astype(np.uint8), 1)
+            self.counts = np.zeros((height, width), dtype=np.uint8)
+            for di in range(3):
+                for dj in range(3):
+                    if (di, dj) != (1, 1):
+                        self.counts += padded[di:di + height, dj:dj + width]
+        else:
+            # Initialize an empty field, then add the mines
+            self.board = []
+            for i in range(self.height):
+                row = []
+                for j in range(self.width):
+                    row.append(False)
+                self.board.append(row)
+            for i, j in self.mines:
                 self.board[i][j] = True
+            self.counts = None
 
         # At first, player has found no mines
         self.mines_found = set()
@@ -51,7 +89,7 @@ class Minesweeper():
 
     def is_mine(self, cell):
         i, j = cell
-        return self.board[i][j]
+        return bool(self.board[i][j])
 
     def nearby_mines(self, cell):
         """
@@ -60,6 +98,10 @@ class Minesweeper():
         not including the cell itself.
         """
 
+        # Large boards have every count computed already
+        if self.counts is not None:
+            return int(self.counts[cell])
+
         # Keep count of nearby mines
         count = 0
 
@@ -93,15 +135,39 @@ class Sentence():
     """
 
     def __init__(self, cells, count):
-        self.cells = set(cells)
+        self.cells = frozenset(cells)
         self.count = count
 
     def __eq__(self, other):
         return self.cells == other.cells and self.count == other.count
 
+    def __hash__(self):
+        return hash((self.cells, self.count))
+
     def __str__(self):
         return f"{self.cells} = {self.count}"
 
+    def __len__(self):
+        return len(self.cells)
+
+    def keys(self):
+        """Returns the cells of the sentence, the keys it is indexed by."""
+        return self.cells
+
+    def includes(self, other):
+        """
+        Returns whether the cells of `other` are a proper subset
+        of the cells of this sentence.
+        """
+        return other.cells < self.cells
+
+    def difference(self, other):
+        """
+        Returns the sentence about the cells of this sentence that are not
+        in `other`, where `other` is a subset of this sentence.
+        """
+        return Sentence(self.cells - other.cells, self.count - other.count)
+
     def known_mines(self):
         """
         Returns the set of all cells in self.cells known to be mines.
@@ -126,7 +192,7 @@ class Sentence():
         a cell is known to be a mine.
         """
         if cell in self.cells:
-            self.cells.remove(cell)
+            self.cells = self.cells - {cell}
             self.count -= 1
 
     def mark_safe(self, cell):
@@ -135,7 +201,206 @@ class Sentence():
         a cell is known to be safe.
         """
         if cell in self.cells:
-            self.cells.remove(cell)
+            self.cells = self.cells - {cell}
+
+
+class BitSentence():
+    """
+    Sentence about a Minesweeper game with its cells encoded as an int
+    bitmask, where cell (i, j) is bit i * width + j. The mask is kept
+    shifted down to its lowest cell, at `offset`, so it spans at most
+    three rows of the board however large the board is. Subset,
+    difference and size are then a few small int operations.
+
+    It is an alternative kept at parity with Sentence, not an
+    optimisation: sentences have at most eight cells, and frozenset
+    operations on them in C beat the Python-level bit loops this needs
+    to list its cells.
+    """
+
+    def __init__(self, cells, count, width):
+        self.width = width
+        self.count = count
+        self.set_mask(sum(1 << (i * width + j) for (i, j) in cells), 0)
+
+    @classmethod
+    def from_mask(cls, mask, count, width, offset=0):
+        sentence = cls((), count, width)
+        sentence.set_mask(mask, offset)
+        return sentence
+
+    def set_mask(self, mask, offset):
+        """Sets the cells to `mask` shifted up by `offset` bits."""
+        if mask:
+            low = (mask & -mask).bit_length() - 1
+            mask >>= low
+            offset += low
+        else:
+            offset = 0
+        self.mask = mask
+        self.offset = offset
+        self.decoded = None
+        self.bits = None
+
+    def __eq__(self, other):
+        return (self.mask == other.mask and self.offset == other.offset
+                and self.count == other.count)
+
+    def __hash__(self):
+        return hash((self.mask, self.offset, self.count))
+
+    def __str__(self):
+        return f"{self.cells} = {self.count}"
+
+    def __len__(self):
+        return self.mask.bit_count()
+
+    @property
+    def cells(self):
+        """The frozenset of (i, j) cells in the sentence."""
+        if self.decoded is None:
+            self.decoded = frozenset(
+                divmod(key, self.width) for key in self.keys()
+            )
+        return self.decoded
+
+    def keys(self):
+        """Returns the bit of every cell in the sentence."""
+        if self.bits is None:
+            self.bits = []
+            mask = self.mask
+            while mask:
+                bit = mask & -mask
+                self.bits.append(self.offset + bit.bit_length() - 1)
+                mask ^= bit
+        return self.bits
+
+    def aligned(self, other):
+        """
+        Returns the mask of `other` shifted to the offset of this sentence,
+        or None if `other` has a cell below it.
+        """
+        shift = other.offset - self.offset
+        if shift < 0:
+            return None
+        return other.mask << shift
+
+    def includes(self, other):
+        """
+        Returns whether the cells of `other` are a proper subset
+        of the cells of this sentence.
+        """
+        shift = other.offset - self.offset
+        if shift < 0:
+            return False
+        mask = other.mask << shift
+        return mask & self.mask == mask and mask != self.mask
+
+    def difference(self, other):
+        """
+        Returns the sentence about the cells of this sentence that are not
+        in `other`, where `other` is a subset of this sentence.
+        """
+        return BitSentence.from_mask(
+            self.mask & ~self.aligned(other), self.count - other.count,
+            self.width, self.offset
+        )
+
+    def known_mines(self):
+        """
+        Returns the set of all cells in self.cells known to be mines.
+        """
+        if self.count == len(self):
+            return self.cells
+        else:
+            return set()
+
+    def known_safes(self):
+        """
+        Returns the set of all cells in self.cells known to be safe.
+        """
+        if self.count == 0:
+            return self.cells
+        else:
+            return set()
+
+    def bit(self, cell):
+        """Returns the bit of `cell` in the shifted mask, 0 if below it."""
+        i, j = cell
+        shift = i * self.width + j - self.offset
+        return 1 << shift if shift >= 0 else 0
+
+    def mark_mine(self, cell):
+        """
+        Updates internal knowledge representation given the fact that
+        a cell is known to be a mine.
+        """
+        bit = self.bit(cell)
+        if self.mask & bit:
+            self.count -= 1
+            self.set_mask(self.mask ^ bit, self.offset)
+
+    def mark_safe(self, cell):
+        """
+        Updates internal knowledge representation given the fact that
+        a cell is known to be safe.
+        """
+        bit = self.bit(cell)
+        if self.mask & bit:
+            self.set_mask(self.mask ^ bit, self.offset)
+
+
+def reduced_row_echelon(rows):
+    """
+    Reduces a system of linear equations with integer coefficients, each
+    a (row, constant) pair with the row a sparse dict from variable to
+    coefficient, to reduced row echelon form. Arithmetic stays exact by
+    cross-multiplying rows and dividing out their common factor.
+    Returns the nonzero reduced rows.
+    """
+    # rows containing each variable
+    rows = [(dict(row), constant) for row, constant in rows]
+    containing = dict()
+    for n, (row, _) in enumerate(rows):
+        for variable in row:
+            containing.setdefault(variable, set()).add(n)
+
+    pivots = set()
+    for n in range(len(rows)):
+        row, constant = rows[n]
+        if not row:
+            continue
+        pivot = min(row, key=lambda variable: len(containing[variable]))
+        p = row[pivot]
+        pivots.add(n)
+
+        # eliminate the pivot variable from every other row
+        for m in list(containing[pivot]):
+            if m == n:
+                continue
+            other, other_constant = rows[m]
+            c = other[pivot]
+            for variable in other:
+                other[variable] *= p
+            other_constant = other_constant * p - constant * c
+            for variable, coefficient in row.items():
+                value = other.get(variable, 0) - coefficient * c
+                if value:
+                    if variable not in other:
+                        containing[variable].add(m)
+                    other[variable] = value
+                elif variable in other:
+                    del other[variable]
+                    containing[variable].discard(m)
+
+            divisor = math.gcd(other_constant, *other.values())
+            if divisor > 1:
+                for variable in other:
+                    other[variable] //= divisor
+                other_constant //= divisor
+            rows[m] = (other, other_constant)
+
+    return [rows[n] for n in sorted(pivots) if rows[n][0]]
 
 
 class MinesweeperAI():
@@ -143,12 +408,25 @@ class MinesweeperAI():
     Minesweeper game player
     """
 
-    def __init__(self, height=8, width=8):
+    def __init__(self, height=8, width=8, mines=None, bitsets=False,
+                 linear=False, timing=False):
 
         # Set initial height and width
         self.height = height
         self.width = width
 
+        # Total number of mines on the board, if known
+        self.total_mines = mines
+
+        # Whether sentences store their cells as bitmasks; moves are the
+        # same either way, but overlapping sentences are tried in another
+        # order, so the count of inferences can differ
+        self.bitsets = bitsets
+
+        # Whether to solve the sentences as a linear system when pairwise
+        # inference finds no safe move
+        self.linear = linear
+
         # Keep track of which cells have been clicked on
         self.moves_made = set()
 
@@ -156,8 +434,92 @@ class MinesweeperAI():
         self.mines = set()
         self.safes = set()
 
+        # Cells known to be safe that have not been chosen yet, also kept
+        # in a heap so that the smallest is chosen first; the heap may
+        # still hold cells that have since been chosen
+        self.safe_moves = set()
+        self.safe_heap = []
+
+        # Cells neither chosen nor known to be mines: listed the first
+        # time random draws fail to find one, then kept up to date
+        self.unknown = None
+
         # List of sentences about the game known to be true
-        self.knowledge = []
+        self.knowledge = set()
+
+        # Sentences containing each cell, keyed by the cell itself or, with
+        # bitsets, by its bit
+        self.sentences_by_cell = dict()
+
+        # New or changed sentences still to be checked for inferences
+        self.changed = []
+
+        # Solutions of frontier components, by their sentences
+        self.component_cache = dict()
+
+        # Counts of sentences added, sentences inferred from pairs of
+        # sentences, passes of inference and linear eliminations
+        self.statistics = {
+            "sentences": 0,
+            "inferences": 0,
+            "passes": 0,
+            "eliminations": 0,
+        }
+
+        # Seconds taken by each call to add_knowledge, if timing
+        self.timings = [] if timing else None
+
+    def make_sentence(self, cells, count):
+        """Returns a sentence in the representation the AI was set up with."""
+        if self.bitsets:
+            return BitSentence(cells, count, self.width)
+        return Sentence(cells, count)
+
+    def cell_key(self, cell):
+        """Returns the key of `cell` in sentences_by_cell."""
+        if self.bitsets:
+            return cell[0] * self.width + cell[1]
+        return cell
+
+    def key_cell(self, key):
+        """Returns the cell with `key` in sentences_by_cell."""
+        if self.bitsets:
+            return divmod(key, self.width)
+        return key
+
+    def add_sentence(self, sentence):
+        """
+        Adds a sentence to the knowledge base unless it is empty or
+        already known, indexing it by cell and queueing it for inference.
+        """
+        if len(sentence) == 0 or sentence in self.knowledge:
+            return
+        self.statistics["sentences"] += 1
+        self.knowledge.add(sentence)
+        for key in sentence.keys():
+            self.sentences_by_cell.setdefault(key, []).append(sentence)
+        self.changed.append(sentence)
+
+    def update_sentence(self, sentence, update):
+        """
+        Applies `update` to a sentence of the knowledge base. Sentences
+        hash by value, so it leaves the set while it changes, and is
+        dropped if it ends up empty or equal to another sentence.
+        """
+        self.knowledge.discard(sentence)
+        update()
+        if len(sentence) == 0:
+            return
+        if sentence in self.knowledge:
+            for key in sentence.keys():
+                self.sentences_by_cell[key] = [
+                    s for s in self.sentences_by_cell[key] if s is not sentence
+                ]
+                if not self.sentences_by_cell[key]:
+                    del self.sentences_by_cell[key]
+            return
+        self.knowledge.add(sentence)
+        self.changed.append(sentence)
 
     def mark_mine(self, cell):
         """
@@ -165,8 +527,10 @@ class MinesweeperAI():
         to mark that cell as a mine as well.
         """
         self.mines.add(cell)
-        for sentence in self.knowledge:
-            sentence.mark_mine(cell)
+        if self.unknown is not None:
+            self.unknown.discard(cell)
+        for sentence in self.sentences_by_cell.pop(self.cell_key(cell), []):
+            self.update_sentence(sentence, lambda: sentence.mark_mine(cell))
 
     def mark_safe(self, cell):
         """
@@ -174,8 +538,45 @@ class MinesweeperAI():
         to mark that cell as safe as well.
         """
         self.safes.add(cell)
-        for sentence in self.knowledge:
-            sentence.mark_safe(cell)
+        if cell not in self.moves_made:
+            self.safe_moves.add(cell)
+            heapq.heappush(self.safe_heap, cell)
+        for sentence in self.sentences_by_cell.pop(self.cell_key(cell), []):
+            self.update_sentence(sentence, lambda: sentence.mark_safe(cell))
+
+    def update_existing_knowledge(self):
+        """
+        Draws conclusions from new or changed sentences until there are
+        none left: marks the safes and mines they reveal, and infers the
+        difference with every overlapping sentence that is a subset or
+        superset of them.
+        """
+        self.statistics["passes"] += 1
+        while self.changed:
+            sentence = self.changed.pop()
+
+            # skip sentences changed or dropped since they were queued
+            if sentence not in self.knowledge:
+                continue
+            for c in sentence.known_safes():
+                self.mark_safe(c)
+            for c in sentence.known_mines():
+                self.mark_mine(c)
+            if sentence not in self.knowledge:
+                continue
+
+            # only sentences sharing a cell can be subsets or supersets
+            overlapping = dict()
+            for key in sentence.keys():
+                for other in self.sentences_by_cell.get(key, []):
+                    overlapping[id(other)] = other
+            for other in overlapping.values():
+                if other.includes(sentence):
+                    self.statistics["inferences"] += 1
+                    self.add_sentence(other.difference(sentence))
+                elif sentence.includes(other):
+                    self.statistics["inferences"] += 1
+                    self.add_sentence(sentence.difference(other))
 
     def add_knowledge(self, cell, count):
         """
@@ -192,9 +593,15 @@ class MinesweeperAI():
             5) add any new sentences to the AI's knowledge base
                if they can be inferred from existing knowledge
         """
+        if self.timings is not None:
+            start = time.perf_counter()
+
         # add cell to moves_made
         self.moves_made.add(cell)
-        print(f"move {cell} added to moves made")
+        self.safe_moves.discard(cell)
+        if self.unknown is not None:
+            self.unknown.discard(cell)
+        logger.debug("move %s added to moves made", cell)
         # mark cell as safe
         self.mark_safe(cell)
 
@@ -207,50 +614,74 @@ class MinesweeperAI():
             for col in range(j-1, j+2):
                 if col in range(0, self.width) and row in range(0, self.height):
                     if (row, col) != (i, j) and (row, col) not in self.moves_made and (row, col) not in self.safes:
-                        neighbours.add((row, col))
+                        # known mines are left out of the sentence and its count
+                        if (row, col) in self.mines:
+                            count -= 1
+                        else:
+                            neighbours.add((row, col))
         # create a new sentence and add it to knowledge
-        new_sentence = Sentence(neighbours, count)
-        # mark mines in new sentence
-        for m in self.mines:
-            new_sentence.mark_mine(m)
-        self.knowledge.append(new_sentence)
-        
-        # update existing sentences
-        def update_existing_knowledge():           
-            new_information = True
-            while new_information:
-                new_information = False
-                for sentence in self.knowledge:
-                    if len(sentence.known_safes()) > 0:
-                        for c in list(sentence.known_safes()): 
-                            self.mark_safe(c)
-                        new_information = True
-                    if len(sentence.known_mines()) > 0:
-                        for c in list(sentence.known_mines()): 
-                            self.mark_mine(c)
-                        new_information = True
-                # remove empty sentences
-                self.knowledge = filter(lambda x: len(x.cells) > 0, self.knowledge)
-                # remove repeated sentences
-                self.knowledge = reduce(lambda x, y: x + [y] if y not in x else x, self.knowledge, [])
-        
-        update_existing_knowledge()
-
-        # deduce new information from existing sentences
-        new_knowledge = []
-        # loop through every combination of sentences looking for subsets
-        for sentence_a in self.knowledge:
-            for sentence_b in self.knowledge:
-                if sentence_a != sentence_b:
-                    if sentence_a.cells.issuperset(sentence_b.cells):
-                        leftover_cells = sentence_a.cells.difference(sentence_b.cells)
-                        leftover_count = sentence_a.count - sentence_b.count
-                        new_knowledge.append(Sentence(leftover_cells, leftover_count))
-        # add new information to knowledge
-        self.knowledge = self.knowledge + new_knowledge
-        
-        # update again with new information
-        update_existing_knowledge()
+        self.add_sentence(self.make_sentence(neighbours, count))
+
+        # mark safes and mines and infer new sentences from the changes
+        self.update_existing_knowledge()
+        if self.linear and not self.safe_moves:
+            self.linear_inference()
+
+        if self.timings is not None:
+            self.timings.append(time.perf_counter() - start)
+
+    def to_json(self):
+        """
+        Returns the AI's statistics, the size of what it knows and its
+        timings, if any, as a JSON string.
+        """
+        return json.dumps({
+            "moves": len(self.moves_made),
+            "mines": len(self.mines),
+            "safes": len(self.safes),
+            "knowledge": len(self.knowledge),
+            "statistics": self.statistics,
+            "timings": self.timings,
+        })
+
+    def linear_inference(self):
+        """
+        Treats every sentence as a linear equation over 0/1 cell
+        variables, reduces the system by Gauss-Jordan elimination, and
+        marks the cells forced by the bounds of each reduced equation.
+        Repeats, with pairwise inference in between, until no more cells
+        are forced.
+
+        This catches deductions that need three or more sentences at once.
+        """
+        while self.knowledge:
+            rows = [
+                (dict.fromkeys(sentence.cells, 1), sentence.count)
+                for sentence in self.knowledge
+            ]
+            mines = set()
+            safes = set()
+            for row, count in reduced_row_echelon(rows):
+
+                # the cells can add up to anything between low and high
+                low = sum(c for c in row.values() if c < 0)
+                high = sum(c for c in row.values() if c > 0)
+                if count == low:
+                    mines.update(cell for cell, c in row.items() if c < 0)
+                    safes.update(cell for cell, c in row.items() if c > 0)
+                elif count == high:
+                    mines.update(cell for cell, c in row.items() if c > 0)
+                    safes.update(cell for cell, c in row.items() if c < 0)
+            self.statistics["eliminations"] += 1
+            if not mines and not safes:
+                return
+            logger.debug("linear system forces %d mines and %d safes",
+                         len(mines), len(safes))
+            for cell in safes:
+                self.mark_safe(cell)
+            for cell in mines:
+                self.mark_mine(cell)
+            self.update_existing_knowledge()
 
     def make_safe_move(self):
         """
@@ -261,9 +692,10 @@ class MinesweeperAI():
         This function may use the knowledge in self.mines, self.safes
         and self.moves_made, but should not modify any of those values.
         """
-        safe_options = self.safes.difference(self.moves_made)
-        if len(safe_options) > 0:
-            return safe_options.pop()
+        if len(self.safe_moves) > 0:
+            while self.safe_heap[0] not in self.safe_moves:
+                heapq.heappop(self.safe_heap)
+            return self.safe_heap[0]
         else:
             return None
 
@@ -273,10 +705,227 @@ class MinesweeperAI():
         Should choose randomly among cells that:
             1) have not already been chosen, and
             2) are not known to be mines
+
+        When the total number of mines is known, chooses randomly among
+        the cells with the lowest probability of being a mine.
         """
-        options = set()
-        for i in range(self.height):
-            for j in range(self.width):
-                if (i,j) not in self.moves_made and (i,j) not in self.mines:
-                    options.add((i,j))
-        return options.pop()
+        if self.total_mines is None:
+            return self.random_unknown_cell()
+
+        probabilities, density = self.mine_probabilities()
+        lowest = min(probabilities.values(), default=1.0)
+        if density is not None and density <= lowest:
+            return self.random_unknown_cell(exclude=probabilities)
+        if not probabilities:
+            return None
+        return random.choice(sorted(
+            cell for cell in probabilities if probabilities[cell] == lowest
+        ))
+
+    def random_unknown_cell(self, exclude=()):
+        """
+        Returns a random cell that has not been chosen, is not known to
+        be a mine and is not in `exclude`, or None if there is none.
+        Cells are drawn at random while most of the board is unknown,
+        without listing the unknown cells.
+        """
+        total = self.height * self.width
+        if 2 * (len(self.moves_made) + len(self.mines)) < total:
+            for attempt in range(RANDOM_ATTEMPTS):
+                cell = (random.randrange(self.height),
+                        random.randrange(self.width))
+                if (cell not in self.moves_made and cell not in self.mines
+                        and cell not in exclude):
+                    return cell
+
+        if self.unknown is None:
+            self.unknown = set()
+            for i in range(self.height):
+                for j in range(self.width):
+                    if (i,j) not in self.moves_made and (i,j) not in self.mines:
+                        self.unknown.add((i,j))
+        options = sorted(cell for cell in self.unknown if cell not in exclude)
+        if not options:
+            return None
+        return random.choice(options)
+
+    def frontier_components(self):
+        """
+        Splits the cells of the knowledge base into groups linked by
+        sentences. Returns a list of (cells, sentences) pairs, where no
+        sentence of one group shares a cell with another group, with the
+        cells and the groups in sorted order.
+        """
+        components = []
+        seen = set()
+        for start in self.sentences_by_cell:
+            if start in seen:
+                continue
+            seen.add(start)
+            cells = []
+            sentences = dict()
+            queue = [start]
+            while queue:
+                cell = queue.pop()
+                cells.append(cell)
+                for sentence in self.sentences_by_cell[cell]:
+                    sentences[id(sentence)] = sentence
+                    for other in sentence.keys():
+                        if other not in seen:
+                            seen.add(other)
+                            queue.append(other)
+            cells.sort()
+            cells = [self.key_cell(cell) for cell in cells]
+            components.append((cells, list(sentences.values())))
+        components.sort(key=lambda component: component[0])
+        return components
+
+    def component_solutions(self, cells, sentences, deadline):
+        """
+        Enumerates the mine assignments to `cells` consistent with every
+        sentence, by backtracking. Returns a dict mapping each number of
+        mines k to (number of assignments, list of how many of them put a
+        mine in each cell), or None if the component is too large or the
+        deadline passes. Results are cached by the component's sentences.
+        """
+        key = frozenset(sentences)
+        if key in self.component_cache:
+            return self.component_cache[key]
+        if len(cells) > COMPONENT_LIMIT:
+            return None
+
+        constraints = [[] for cell in cells]
+        index = {cell: i for i, cell in enumerate(cells)}
+        remaining = [sentence.count for sentence in sentences]
+        unassigned = [len(sentence) for sentence in sentences]
+        for s, sentence in enumerate(sentences):
+            for cell in sentence.cells:
+                constraints[index[cell]].append(s)
+        assignment = [0] * len(cells)
+        solutions = dict()
+
+        def backtrack(i, mines):
+            if time.perf_counter() > deadline:
+                raise TimeoutError
+            if i == len(cells):
+                solution = solutions.setdefault(mines, [0, [0] * len(cells)])
+                solution[0] += 1
+                for j, value in enumerate(assignment):
+                    solution[1][j] += value
+                return
+            for value in (0, 1):
+                assignment[i] = value
+                for s in constraints[i]:
+                    remaining[s] -= value
+                    unassigned[s] -= 1
+                if all(0 <= remaining[s] <= unassigned[s]
+                       for s in constraints[i]):
+                    backtrack(i + 1, mines + value)
+                for s in constraints[i]:
+                    remaining[s] += value
+                    unassigned[s] += 1
+            assignment[i] = 0
+
+        try:
+            backtrack(0, 0)
+        except TimeoutError:
+            return None
+        solutions = {k: tuple(v) for k, v in solutions.items()}
+        self.component_cache[key] = solutions
+        return solutions
+
+    def mine_probabilities(self):
+        """
+        Returns the probability that each frontier cell is a mine, given
+        the knowledge base and the total number of mines, along with the
+        probability shared by every other unknown cell (None if there are
+        no other unknown cells).
+
+        Frontier components are solved exactly and combined, weighting each
+        split of the remaining mines by the number of ways to place the
+        rest in unconstrained cells. Components that are too large or run
+        out of time fall back to the highest count / size ratio of their
+        sentences.
+        """
+        deadline = time.perf_counter() + MOVE_TIME_LIMIT
+        probabilities = dict()
+        exact = []
+        estimated_mines = 0
+        for cells, sentences in self.frontier_components():
+            solutions = self.component_solutions(cells, sentences, deadline)
+            if solutions:
+                exact.append((cells, solutions))
+                continue
+            for cell in cells:
+                probabilities[cell] = max(
+                    sentence.count / len(sentence)
+                    for sentence in self.sentences_by_cell[self.cell_key(cell)]
+                )
+                estimated_mines += probabilities[cell]
+
+        for cell in self.safe_moves:
+            probabilities[cell] = 0.0
+        frontier = len(probabilities) + sum(len(cells) for cells, _ in exact)
+        unconstrained = (self.height * self.width - len(self.moves_made)
+                         - len(self.mines) - frontier)
+        mines_left = self.total_mines - len(self.mines) - round(estimated_mines)
+
+        # Distribution of frontier mines over every component but one
+        def combine(parts):
+            total = {0: 1.0}
+            for solutions in parts:
+                top = max(ways for ways, _ in solutions.values())
+                merged = dict()
+                for a, x in total.items():
+                    for b, (ways, _) in solutions.items():
+                        merged[a + b] = merged.get(a + b, 0.0) + x * ways / top
+                total = merged
+            return total
+
+        everything = combine([solutions for _, solutions in exact])
+
+        # Ways to place r mines in unconstrained cells, in log space and
+        # relative to the most for any r in play, so that large boards
+        # do not underflow
+        def log_ways(r):
+            return (math.lgamma(unconstrained + 1) - math.lgamma(r + 1)
+                    - math.lgamma(unconstrained - r + 1))
+
+        scale = max(
+            (log_ways(mines_left - k) for k in everything
+             if 0 <= mines_left - k <= unconstrained),
+            default=0.0
+        )
+
+        def rest(r):
+            if r < 0 or r > unconstrained:
+                return 0.0
+            return math.exp(log_ways(r) - scale)
+
+        weight = sum(x * rest(mines_left - k) for k, x in everything.items())
+        if weight == 0:
+            # Inconsistent totals: fall back to even guesses
+            for cells, _ in exact:
+                for cell in cells:
+                    probabilities[cell] = 0.5
+            return probabilities, 0.5 if unconstrained else None
+
+        for n, (cells, solutions) in enumerate(exact):
+            others = combine([s for m, (_, s) in enumerate(exact) if m != n])
+            top = max(ways for ways, _ in solutions.values())
+            expected = [0.0] * len(cells)
+            for k, (ways, counts) in solutions.items():
+                factor = sum(
+                    x * rest(mines_left - k - j) for j, x in others.items()
+                ) / top / weight
+                for i, count in enumerate(counts):
+                    expected[i] += count * factor
+            for cell, probability in zip(cells, expected):
+                probabilities[cell] = probability
+
+        if not unconstrained:
+            return probabilities, None
+        frontier_mines = sum(
+            x * rest(mines_left - k) * k for k, x in everything.items()
+        ) / weight
+        return probabilities, (mines_left - frontier_mines) / unconstrained
@@ -0,0 +1,128 @@
+import json
+import multiprocessing
+import random
+import sys
+import time
+
+from minesweeper import Minesweeper, MinesweeperAI
+
+HEIGHT = 8
+WIDTH = 8
+MINES = 8
+GAMES = 100
+
+# Boards with at least this many cells use the NumPy-backed board
+LARGE_CELLS = 100000
+
+
+def main():
+    args = sys.argv[1:]
+    as_json = "--json" in args
+    if as_json:
+        args.remove("--json")
+    bitsets = "--bitsets" in args
+    if bitsets:
+        args.remove("--bitsets")
+    if len(args) not in [1, 4]:
+        sys.exit("Usage: python simulate.py [--json] [--bitsets] "
+                 "games [height width mines]")
+    games = int(args[0])
+    if len(args) == 4:
+        height, width, mines = (int(arg) for arg in args[1:])
+    else:
+        height, width, mines = HEIGHT, WIDTH, MINES
+
+    start = time.perf_counter()
+    results = simulate(games, height, width, mines, bitsets=bitsets)
+    elapsed = time.perf_counter() - start
+
+    if as_json:
+        print(json.dumps({
+            "height": height,
+            "width": width,
+            "mines": mines,
+            "bitsets": bitsets,
+            "seconds": elapsed,
+            "games": results,
+        }))
+        return
+
+    wins = sum(result["won"] for result in results)
+    moves = [result["moves"] for result in results]
+    timings = sorted(t for result in results for t in result["timings"])
+    print(f"{games} games on {height}x{width} with {mines} mines "
+          f"{'with bitsets ' if bitsets else ''}in {elapsed:.2f}s")
+    print(f"  Win rate: {100 * wins / games:.1f}%")
+    print(f"  Moves per game: {sum(moves) / games:.1f}")
+    if timings:
+        mean = sum(timings) / len(timings)
+        p95 = timings[int(0.95 * (len(timings) - 1))]
+        print(f"  add_knowledge: {1e6 * mean:.1f}us mean, "
+              f"{1e6 * p95:.1f}us p95, {len(timings)} calls")
+    for name in results[0]["statistics"]:
+        total = sum(result["statistics"][name] for result in results)
+        print(f"  {name} per game: {total / games:.1f}")
+
+    # Average knowledge base size after each tenth of the longest game
+    longest = max(moves)
+    print("  Knowledge base size over time:")
+    for tenth in range(1, 11):
+        move = max(1, tenth * longest // 10)
+        sizes = [result["sizes"][move - 1] for result in results
+                 if len(result["sizes"]) >= move]
+        if sizes:
+            print(f"    move {move}: {sum(sizes) / len(sizes):.1f} "
+                  f"sentences ({len(sizes)} games)")
+
+
+def simulate(games, height=HEIGHT, width=WIDTH, mines=MINES,
+             processes=None, seed=0, bitsets=False):
+    """
+    Play `games` seeded games of Minesweeper with the AI across a
+    process pool, with bitmask sentences if `bitsets`. Return one result
+    dict per game, in seed order.
+    """
+    tasks = [(seed + n, height, width, mines, bitsets) for n in range(games)]
+    with multiprocessing.Pool(processes) as pool:
+        return pool.starmap(play, tasks)
+
+
+def play(seed, height, width, mines, bitsets=False):
+    """
+    Play one game with the AI until it hits a mine or runs out of moves.
+    Return whether it won, the number of moves made, the seconds taken by
+    each call to add_knowledge, the knowledge base size after each, and
+    the AI's statistics.
+    """
+    random.seed(seed)
+    game = Minesweeper(height=height, width=width, mines=mines,
+                       large=height * width >= LARGE_CELLS)
+    ai = MinesweeperAI(height=height, width=width, mines=mines,
+                       bitsets=bitsets, timing=True)
+    sizes = []
+    won = False
+
+    while True:
+        move = ai.make_safe_move()
+        if move is None:
+            move = ai.make_random_move()
+            if move is None:
+                won = ai.mines == game.mines
+                break
+        if game.is_mine(move):
+            break
+        ai.add_knowledge(move, game.nearby_mines(move))
+        sizes.append(len(ai.knowledge))
+
+    return {
+        "seed": seed,
+        "won": won,
+        "moves": len(ai.timings),
+        "timings": ai.timings,
+        "sizes": sizes,
+        "statistics": ai.statistics,
+    }
+
+
+if __name__ == "__main__":
+    main()
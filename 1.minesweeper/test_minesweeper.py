@@ -0,0 +1,73 @@
+import itertools
+import random
+
+from minesweeper import Minesweeper, MinesweeperAI
+
+
+def play(ai, game, moves, survive=False):
+    """
+    Make up to `moves` moves, stopping at a mine unless `survive`, in
+    which case the mine is marked and play goes on.
+    """
+    made = 0
+    while made < moves:
+        move = ai.make_safe_move() or ai.make_random_move()
+        if move is None:
+            break
+        if game.is_mine(move):
+            if not survive:
+                break
+            ai.mark_mine(move)
+            continue
+        ai.add_knowledge(move, game.nearby_mines(move))
+        made += 1
+
+
+def brute_force(height, width, mines, revealed):
+    """
+    Return the chance that each cell is a mine, over every placement of
+    the mines consistent with the counts of the revealed cells.
+    """
+    cells = [(i, j) for i in range(height) for j in range(width)]
+    counts = dict.fromkeys(cells, 0)
+    total = 0
+    hidden = [cell for cell in cells if cell not in revealed]
+    for placement in itertools.combinations(hidden, mines):
+        placement = set(placement)
+        if all(
+            sum((k, l) in placement
+                for k in range(i - 1, i + 2) for l in range(j - 1, j + 2)) == count
+            for (i, j), count in revealed.items()
+        ):
+            total += 1
+            for cell in placement:
+                counts[cell] += 1
+    return {cell: counts[cell] / total for cell in cells}
+
+
+def test_mine_probabilities_match_brute_force():
+    height, width, mines = 4, 5, 5
+    for seed in range(40):
+        random.seed(seed)
+        game = Minesweeper(height, width, mines)
+        ai = MinesweeperAI(height, width, mines=mines)
+        play(ai, game, random.randint(1, 4))
+        revealed = {cell: game.nearby_mines(cell) for cell in ai.moves_made}
+        expected = brute_force(height, width, mines, revealed)
+
+        probabilities, density = ai.mine_probabilities()
+        for cell, probability in expected.items():
+            if cell in revealed or cell in ai.mines:
+                continue
+            assert abs(probabilities.get(cell, density) - probability) < 1e-9
+
+
+def test_mine_probabilities_on_large_boards():
+    for height, width, mines in [(50, 50, 300), (100, 100, 1000)]:
+        random.seed(3)
+        game = Minesweeper(height, width, mines)
+        ai = MinesweeperAI(height, width, mines=mines)
+        play(ai, game, 5, survive=True)
+        probabilities, density = ai.mine_probabilities()
+        assert 0 < density < 0.5
+        assert any(0 < p < 1 and p != 0.5 for p in probabilities.values())
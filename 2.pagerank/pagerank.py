@@ -1,11 +1,44 @@
+import multiprocessing
 import os
 import random
 import re
 import sys
 
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    from scipy import sparse
+except ImportError:
+    sparse = None
+
 DAMPING = 0.85
 SAMPLES = 10000
 
+# Pages are read this many characters at a time
+CHUNK_SIZE = 2 ** 16
+
+# Directories with at least this many pages are crawled by a process pool
+CRAWL_PARALLEL_MINIMUM = 1000
+
+# Start of a link: the same as the start of the pattern crawl looks for
+ANCHOR = re.compile(r"<a\s")
+
+# Iteration stops once no rank changes by more than this
+CONVERGENCE_LIMIT = 0.001
+
+# With NumPy, corpora of at least this many pages iterate over a sparse matrix
+SPARSE_MINIMUM = 1000
+
+# With NumPy, this many samples or more are drawn by walkers moving together
+WALKER_MINIMUM = 100000
+WALKERS = 4096
+
+# Steps each walker takes before its pages are counted, to forget its start
+BURN_IN = 64
+
 
 def main():
     if len(sys.argv) != 2:
@@ -30,13 +63,18 @@ def crawl(directory):
     pages = dict()
 
     # Extract all links from HTML files
-    for filename in os.listdir(directory):
-        if not filename.endswith(".html"):
-            continue
-        with open(os.path.join(directory, filename)) as f:
-            contents = f.read()
-            links = re.findall(r"<a\s+(?:[^>]*?)href=\"([^\"]*)\"", contents)
-            pages[filename] = set(links) - {filename}
+    filenames = [
+        filename for filename in os.listdir(directory)
+        if filename.endswith(".html")
+    ]
+    paths = [os.path.join(directory, filename) for filename in filenames]
+    if len(paths) >= CRAWL_PARALLEL_MINIMUM and (os.cpu_count() or 1) > 1:
+        with multiprocessing.Pool() as pool:
+            links = pool.map(crawl_page, paths, chunksize=64)
+    else:
+        links = map(crawl_page, paths)
+    for filename, page_links in zip(filenames, links):
+        pages[filename] = page_links - {filename}
 
     # Only include links to other pages in the corpus
     for filename in pages:
@@ -48,7 +86,127 @@ def crawl(directory):
     return pages
 
 
-def transition_model(corpus, page, damping_factor):
+def crawl_page(path):
+    """
+    Return the set of links in the HTML page at `path`, reading it in
+    chunks rather than all at once.
+    """
+    parser = LinkParser()
+    with open(path) as f:
+        while True:
+            chunk = f.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            parser.feed(chunk)
+    return parser.links
+
+
+class LinkParser():
+    """
+    Incremental parser for the links of an HTML page. Fed the page in
+    chunks of any size, it finds the same links as the regular expression
+    <a\\s+(?:[^>]*?)href="([^"]*)" over the whole page: the first
+    href="..." in each <a tag, before the tag closes.
+    """
+
+    def __init__(self):
+        self.buffer = ""
+        self.links = set()
+
+    def feed(self, chunk):
+        """
+        Parse another chunk of the page, keeping any link that might
+        continue into the next chunk until it arrives.
+        """
+        buffer = self.buffer + chunk
+        position = 0
+        while True:
+            anchor = ANCHOR.search(buffer, position)
+            if anchor is None:
+                # the end might be the start of an anchor
+                position = max(position, len(buffer) - 2)
+                break
+
+            # look for the link before the tag closes
+            start = anchor.end()
+            end = buffer.find(">", start)
+            href = buffer.find('href="', start, len(buffer) if end < 0 else end)
+            if href < 0:
+                if end < 0:
+                    position = anchor.start()
+                    break
+                position = end + 1
+                continue
+
+            quote = buffer.find('"', href + 6)
+            if quote < 0:
+                position = anchor.start()
+                break
+            self.links.add(buffer[href + 6:quote])
+            position = quote + 1
+
+        self.buffer = buffer[position:]
+
+
+def link_structure(corpus):
+    """
+    Preprocess the links of a corpus once, for the functions below.
+    Return the list of pages, a dictionary from each page to the list of
+    pages that link to it, a dictionary from each page to the tuple of
+    pages it links to, a dictionary from each page to its number of
+    links, and the list of pages with no links.
+    """
+    pages = list(corpus)
+    inbound = {page: [] for page in pages}
+    outbound = dict()
+    degrees = dict()
+    for page in pages:
+        outbound[page] = tuple(corpus[page])
+        degrees[page] = len(outbound[page])
+        for link in outbound[page]:
+            inbound[link].append(page)
+    dangling = [page for page in pages if degrees[page] == 0]
+    return pages, inbound, outbound, degrees, dangling
+
+
+def transition_table(pages, links, damping_factor):
+    """
+    Precompute the transition model of a page linking to the tuple
+    `links`, out of all `pages`, for sampling in constant time. Return
+    a tuple of the chance of following a link, the links, the set of
+    linked pages, and a tuple of the pages it does not link to if they
+    are fewer than its links. Otherwise that last item is None, and those
+    pages are found by drawing from all pages until one is not linked,
+    which takes at most two draws on average.
+    """
+    # if all pages or no pages are linked, ignore damping factor
+    if len(links) == 0:
+        follow = 0.0
+    elif len(links) == len(pages):
+        follow = 1.0
+    else:
+        follow = damping_factor
+
+    linked = frozenset(links)
+    others = None
+    if len(pages) - len(links) < len(links):
+        others = tuple(other for other in pages if other not in linked)
+    return follow, links, linked, others
+
+
+def transition_tables(structure, damping_factor):
+    """
+    Return a dictionary from each page of a corpus, given its
+    `link_structure`, to its `transition_table`.
+    """
+    pages, _, outbound, _, _ = structure
+    return {
+        page: transition_table(pages, outbound[page], damping_factor)
+        for page in pages
+    }
+
+
+def transition_model(corpus, page, damping_factor, structure=None):
     """
     Return a probability distribution over which page to visit next,
     given a current page.
@@ -56,25 +214,23 @@ def transition_model(corpus, page, damping_factor):
     With probability `damping_factor`, choose a link at random
     linked to by `page`. With probability `1 - damping_factor`, choose
     a link at random chosen from all pages in the corpus.
-    """
-    linked_pages = list(corpus[page])
-    all_pages = [k for k in corpus]
-    not_linked = list(set(all_pages).difference(corpus[page]))
-    distribution = {}
 
-    # if all pages or no pages are linked, ignore damping factor
-    if len(linked_pages) == 0 or len(not_linked) == 0:
-        for page in all_pages:
-            distribution[page] = 1/len(all_pages)
-        return distribution
-    
+    `structure` is the corpus's `link_structure`, if already computed.
+    """
+    if structure is not None:
+        all_pages, _, outbound, _, _ = structure
+        links = outbound[page]
+    else:
+        all_pages = list(corpus)
+        links = tuple(corpus[page])
+    follow, links, _, _ = transition_table(all_pages, links, damping_factor)
+    not_linked = len(all_pages) - len(links)
 
-    # else consider damping factor
-    for page in all_pages:
-        if page in linked_pages:
-            distribution[page] = damping_factor/len(linked_pages)
-        else:
-            distribution[page] = (1 - damping_factor)/len(not_linked)
+    distribution = dict.fromkeys(
+        all_pages, (1 - follow)/not_linked if not_linked else 0
+    )
+    for other in links:
+        distribution[other] = follow/len(links)
 
     return distribution
 
@@ -87,7 +243,12 @@ def sample_pagerank(corpus, damping_factor, n):
     their estimated PageRank value (a value between 0 and 1). All
     PageRank values should sum to 1.
     """
-    page_list = [k for k in corpus]
+    structure = link_structure(corpus)
+    if np is not None and n >= WALKER_MINIMUM:
+        return sample_pagerank_walkers(structure, damping_factor, n)
+
+    page_list = structure[0]
+    tables = transition_tables(structure, damping_factor)
     counter = dict.fromkeys(page_list, 0)
     
     # select first page at random 
@@ -97,24 +258,17 @@ def sample_pagerank(corpus, damping_factor, n):
     
     # apply transition model n times
     while page_count < n:
-        # get probability distribution for current page
-        rank = transition_model(corpus,current_page,damping_factor)
-        # turn rank into a vector-like list
-        rank_vector = []
-        rank_sum = 0
-        for page in page_list:
-            rank_sum += rank[page]
-            rank_vector.append(rank_sum)
-        
-        # select a page accornding to probability vector
-        random_v = random.random()
-        min_v = 0
-        for index,max_v in enumerate(rank_vector):
-            if random_v >= min_v and random_v < max_v:
-                current_page = page_list[index]
-                break
-            else:
-                min_v = max_v
+        follow, links, linked, others = tables[current_page]
+
+        # follow a link, or jump to a page that is not linked
+        if random.random() < follow:
+            current_page = random.choice(links)
+        elif others is not None:
+            current_page = random.choice(others)
+        else:
+            current_page = random.choice(page_list)
+            while current_page in linked:
+                current_page = random.choice(page_list)
 
         # update counter and page_count
         counter[current_page] += 1
@@ -127,6 +281,82 @@ def sample_pagerank(corpus, damping_factor, n):
     return counter
 
 
+def sample_pagerank_walkers(structure, damping_factor, n, walkers=WALKERS):
+    """
+    Return PageRank values for each page of a corpus, given its
+    `link_structure`, by sampling `n` pages with the same transition
+    model as `sample_pagerank`, but with many surfers walking at once in
+    NumPy arrays. Each starts at a random page and walks `BURN_IN`
+    uncounted steps, then the samples are shared evenly between them.
+    """
+    pages, _, outbound, link_counts, _ = structure
+    size = len(pages)
+    index = {page: i for i, page in enumerate(pages)}
+
+    # links of each page in CSR form, sorted within each page
+    degrees = np.array([link_counts[page] for page in pages], dtype=np.int64)
+    indptr = np.zeros(size + 1, dtype=np.int64)
+    np.cumsum(degrees, out=indptr[1:])
+    links = np.fromiter(
+        (index[link] for page in pages for link in outbound[page]),
+        dtype=np.int64, count=indptr[-1]
+    )
+    rows = np.repeat(np.arange(size, dtype=np.int64), degrees)
+    order = np.lexsort((links, rows))
+    links = links[order]
+
+    # The r-th page a page does not link to is r plus the number of its
+    # links j (counting from 0) with links[j] - j <= r. Offsetting these
+    # keys by page keeps them sorted, so one search finds every count.
+    position = np.arange(len(links), dtype=np.int64) - indptr[rows]
+    keys = rows * (size + 1) + links - position
+
+    # pages linking to none or all pages move anywhere with equal chance
+    uniform = (degrees == 0) | (degrees == size)
+
+    generator = np.random.default_rng(random.getrandbits(64))
+
+    def advance(current):
+        """Return the next page of each walker on the pages `current`."""
+        draw = generator.random(len(current))
+        follow = generator.random(len(current)) < damping_factor
+        anywhere = uniform[current]
+        following = follow & ~anywhere
+        jumping = ~follow & ~anywhere
+        step = np.empty_like(current)
+
+        # follow a link: pick one of the page's links
+        pages = current[following]
+        choice = (draw[following] * degrees[pages]).astype(np.int64)
+        choice = np.minimum(choice, degrees[pages] - 1)
+        step[following] = links[indptr[pages] + choice]
+
+        # jump: pick one of the pages it does not link to
+        pages = current[jumping]
+        others = size - degrees[pages]
+        choice = np.minimum((draw[jumping] * others).astype(np.int64), others - 1)
+        skipped = np.searchsorted(keys, pages * (size + 1) + choice, side="right")
+        step[jumping] = choice + skipped - indptr[pages]
+
+        # pick any page
+        choice = (draw[anywhere] * size).astype(np.int64)
+        step[anywhere] = np.minimum(choice, size - 1)
+        return step
+
+    current = generator.integers(size, size=min(walkers, n))
+    for _ in range(BURN_IN):
+        current = advance(current)
+
+    counts = np.zeros(size, dtype=np.int64)
+    remaining = n
+    while remaining > 0:
+        current = advance(current[:remaining])
+        counts += np.bincount(current, minlength=size)
+        remaining -= len(current)
+
+    return {page: round(int(count) / n, 4) for page, count in zip(pages, counts)}
+
+
 def iterate_pagerank(corpus, damping_factor):
     """
     Return PageRank values for each page by iteratively updating
@@ -136,17 +366,13 @@ def iterate_pagerank(corpus, damping_factor):
     their estimated PageRank value (a value between 0 and 1). All
     PageRank values should sum to 1.
     """
-    page_list = [k for k in corpus]
-    damping_probability = (1 - damping_factor) / len(page_list)
-    convergence_limit = 0.001
+    structure = link_structure(corpus)
+    if np is not None and len(corpus) >= SPARSE_MINIMUM:
+        return iterate_pagerank_sparse(structure, damping_factor)
 
-    # adjust corpus to handle pages with no links
-    probability_corpus = {}
-    for page in page_list:
-        if len(corpus[page]) == 0:
-            probability_corpus[page] = page_list
-        else:
-            probability_corpus[page] = corpus[page]
+    page_list, inbound, _, degrees, dangling = structure
+    damping_probability = (1 - damping_factor) / len(page_list)
+    convergence_limit = CONVERGENCE_LIMIT
 
     # initialize rank with equal distribution
     rank = dict.fromkeys(page_list, 1/len(page_list))
@@ -154,20 +380,17 @@ def iterate_pagerank(corpus, damping_factor):
 
     # reccursively update rank until convergence
     while not convergence:
-        new_rank = dict.fromkeys(page_list,0)
+        new_rank = dict()
 
-        # calculate new rank for each page
-        for page in page_list:
-            # list of pages that link to this page
-            links_to_page = [p for p, v in probability_corpus.items() if page in v]
-            for other_page in links_to_page:
-                # probability of click from another page
-                link_rank = rank[other_page] / len(probability_corpus[other_page])
-                new_rank[page] += damping_factor * link_rank
-
-        # apply damping factor adjustment
+        # pages with no links are treated as linking to every page
+        dangling_rank = sum(rank[p] for p in dangling) / len(page_list)
+
+        # calculate new rank for each page from the pages linking to it
         for page in page_list:
-            new_rank[page] += damping_probability
+            link_rank = dangling_rank
+            for other_page in inbound[page]:
+                link_rank += rank[other_page] / degrees[other_page]
+            new_rank[page] = damping_factor * link_rank + damping_probability
 
         # check if convergence has been met
         convergence = True      
@@ -179,5 +402,59 @@ def iterate_pagerank(corpus, damping_factor):
 
     return rank
 
+
+def transition_matrix(structure):
+    """
+    Build the link structure of a corpus, from its `link_structure`, as
+    a sparse matrix in CSR form with one row per page listing the pages
+    that link to it. Return the list of pages, the CSR row pointers,
+    column indices and weights (one over the number of links on the
+    linking page), and the indices of pages with no links.
+    """
+    pages, inbound, _, degrees, dangling = structure
+    index = {page: i for i, page in enumerate(pages)}
+    indptr = np.zeros(len(pages) + 1, dtype=np.int64)
+    np.cumsum([len(inbound[page]) for page in pages], out=indptr[1:])
+    indices = np.fromiter(
+        (index[other] for page in pages for other in inbound[page]),
+        dtype=np.int64, count=indptr[-1]
+    )
+    degree = np.array([degrees[page] for page in pages], dtype=np.int64)
+    weights = 1 / degree[indices]
+    dangling = np.array([index[page] for page in dangling], dtype=np.int64)
+    return pages, indptr, indices, weights, dangling
+
+
+def iterate_pagerank_sparse(structure, damping_factor):
+    """
+    Return the same PageRank values as `iterate_pagerank`, computed with
+    sparse matrix-vector products: SciPy's if it is installed, NumPy's
+    bincount otherwise. Pages with no links share their rank equally
+    with every page, as in `iterate_pagerank`.
+    """
+    pages, indptr, indices, weights, dangling = transition_matrix(structure)
+    n = len(pages)
+    if sparse is not None:
+        matrix = sparse.csr_matrix((weights, indices, indptr), shape=(n, n))
+        step = matrix.dot
+    else:
+        rows = np.repeat(np.arange(n), np.diff(indptr))
+
+        def step(rank):
+            return np.bincount(rows, weights=weights * rank[indices],
+                               minlength=n)
+
+    rank = np.full(n, 1 / n)
+    while True:
+        new_rank = damping_factor * (step(rank) + rank[dangling].sum() / n)
+        new_rank += (1 - damping_factor) / n
+        converged = np.abs(new_rank - rank).max() <= CONVERGENCE_LIMIT
+        rank = new_rank
+        if converged:
+            break
+
+    return dict(zip(pages, rank.tolist()))
+
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,46 @@
+import os
+import random
+import re
+
+from pagerank import LinkParser, crawl
+
+# The pattern crawl used to run over whole pages
+PATTERN = r"<a\s+(?:[^>]*?)href=\"([^\"]*)\""
+
+# Pieces that make up awkward HTML when strung together at random
+PIECES = [
+    "<a", " ", "\n", "\t", 'href="', '"', ">", "<", "x", "a", "h", "=",
+    "hr", 'ef="', '<a href="', "y.html",
+]
+
+
+def test_link_parser_matches_pattern_in_any_chunks():
+    random.seed(0)
+    for _ in range(20000):
+        text = "".join(
+            random.choice(PIECES) for _ in range(random.randint(0, 30))
+        )
+        parser = LinkParser()
+        i = 0
+        while i < len(text):
+            size = random.randint(1, 6)
+            parser.feed(text[i:i + size])
+            i += size
+        assert parser.links == set(re.findall(PATTERN, text))
+
+
+def test_crawl_matches_pattern_on_corpora():
+    here = os.path.dirname(os.path.abspath(__file__))
+    for name in ["corpus0", "corpus1", "corpus2"]:
+        directory = os.path.join(here, name)
+        expected = dict()
+        for filename in os.listdir(directory):
+            if filename.endswith(".html"):
+                with open(os.path.join(directory, filename)) as f:
+                    links = set(re.findall(PATTERN, f.read()))
+                expected[filename] = links - {filename}
+        for filename in expected:
+            expected[filename] = {
+                link for link in expected[filename] if link in expected
+            }
+        assert crawl(directory) == expected